@@ -3,33 +3,104 @@
 Handles"""
 #=======================================================================
 # IMPORT
+import bz2 as _bz2
 import csv as _csv
+import glob as _glob
+import gzip as _gzip
 import itertools as _itertools
+import json as _json
+import lzma as _lzma
+import math as _math
+import mmap as _mmap
+import os as _os
 import pathlib as _pathlib
 import re as _re
+import sqlite3 as _sqlite3
 import sys as _sys
+import tempfile as _tempfile
+import time as _time
+import warnings as _warnings
 from abc import ABC as _ABC
 from abc import abstractmethod as _abstractmethod
+from array import array as _array
 from collections import defaultdict as _defaultdict
+from collections import deque as _deque
+from collections.abc import Collection as _Collection
 from collections.abc import Iterable as _Iterable
+from collections.abc import Iterator as _Iterator
+from collections.abc import Mapping as _Mapping
+from collections.abc import Sequence as _Sequence
+from concurrent.futures import Executor as _Executor
+from concurrent.futures import Future as _Future
+from concurrent.futures import ProcessPoolExecutor as _ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
+from contextlib import ExitStack as _ExitStack
+from contextvars import ContextVar as _ContextVar
+from dataclasses import fields as _fields
 from enum import Enum as _Enum
+from functools import cache as _cache
 from functools import partial as _partial
+from hashlib import blake2b as _blake2b
 from io import IOBase as _IOBase
+from io import StringIO as _StringIO
+from io import TextIOWrapper as _TextIOWrapper
+from numbers import Real as _Real
+from operator import add as _add
+from operator import gt as _gt
+from operator import itemgetter as _itemgetter
 from string import punctuation as _punctuation
 from typing import Any as _Any
+from typing import Callable as _Callable
 from typing import ClassVar as _ClassVar
 from typing import Generator as _Generator
+from typing import NamedTuple as _NamedTuple
 from typing import Optional as _Optional
+from typing import Protocol as _Protocol
 from typing import TextIO as _TextIO
+from typing import TypeGuard as _TypeGuard
+
+try:
+    import numpy as _np
+except ImportError: # pragma: no cover
+    _np = None # type: ignore
 
 from .dataclass_validate import dataclass as _dataclass
 from .dataclass_validate import field as _field
 from .dataclass_validate import InitVar as _InitVar
+from .dataclass_validate import set_validation
+from .dataclass_validate import set_validation_policy
+from .dataclass_validate import validate_pending
+from .dataclass_validate import validate_tree
 #=======================================================================
 # AUXILIARIES
 # To skip using slots on python 3.9
 _maybeslots = {} if _sys.version_info[1] <= 9 else {'slots': True}
-_IS_VALIDATION = True
+# Validation can be switched off or deferred via environment variable
+# and validation of only first N objects of each class
+_VALIDATION_MODE = _os.environ.get('YAMDOG_VALIDATION', '1').strip().lower()
+_IS_VALIDATION = _VALIDATION_MODE not in ('0', 'false', 'no', 'off')
+def _validation_first(value: str, is_deferred: bool) -> _Optional[int]:
+    '''Parses number of first objects validated, warning if invalid'''
+    if not (value := value.strip()):
+        return None
+    try:
+        first = int(value)
+    except ValueError:
+        first = -1
+    if first < 0 or is_deferred:
+        _warnings.warn(f"Ignoring YAMDOG_VALIDATION_FIRST='{value}', "
+                       + ('which cannot be used with deferred validation'
+                          if first >= 0 else
+                          'which is not a non-negative integer'),
+                       RuntimeWarning)
+        return None
+    return first
+_VALIDATION_FIRST = _validation_first(
+    _os.environ.get('YAMDOG_VALIDATION_FIRST', ''),
+    _VALIDATION_MODE == 'deferred')
+set_validation(_IS_VALIDATION,
+               first = _VALIDATION_FIRST,
+               deferred = _VALIDATION_MODE == 'deferred')
 _RAW_INDENT = ' ' * 4
 #-----------------------------------------------------------------------
 class Flavour(_Enum):
@@ -43,10 +114,6 @@ class Flavour(_Enum):
 BASIC, EXTENDED, GITHUB, GITLAB, PYPI = Flavour
 #-----------------------------------------------------------------------
 INDENT = '&nbsp;&nbsp;&nbsp;&nbsp;'
-#-----------------------------------------------------------------------
-_ListDict = _partial(_defaultdict, list)
-_empty_collected = lambda: (_ListDict(), _ListDict())
-_Collected = tuple[_defaultdict, _defaultdict] # Type alias for collected items
 #=======================================================================
 _re_ends = _re.compile(r'^\s*\n\s*|\s*\n\s*$')
 _re_middle = _re.compile(r'\s*\n\s*')
@@ -57,72 +124,165 @@ def _sanitise(text: str) -> str:
 def _sanitise_str(content: _Any) -> str:
     return _sanitise(content) if isinstance(content, str) else str(content)
 #-----------------------------------------------------------------------
-def _collect(item: _Any, visited: set[int], collected: _Collected
-             ) -> tuple[set[int], _Collected]:
-    '''Checks if item has collectibles and it has not been visited yet
+class _Writer(_Protocol):
+    '''Anything with a write method taking str, e.g. file or StringIO'''
+    def write(self, text: str, /) -> _Any:
+        ...
+#-----------------------------------------------------------------------
+class _IndentWriter:
+    '''Writer that indents all but the first line'''
+    __slots__ = ('_write', '_newline')
+    def __init__(self, writer: _Writer, indent: str) -> None:
+        self._write = writer.write
+        self._newline = '\n' + indent
+    #-------------------------------------------------------------------
+    def write(self, text: str) -> _Any:
+        return self._write(text.replace('\n', self._newline))
+#-----------------------------------------------------------------------
+def _render(item: _Any, writer: _Writer) -> None:
+    '''Writes elements via render_into and other objects as str
+
+    During document rendering collectable elements are rendered via cache'''
+    if isinstance(item, Element):
+        if (item._is_cached
+            and (index := _render_index.get()) is not None
+            and not index.is_in_note):
+            index.render_cached(item, writer) # type: ignore
+        else:
+            item.render_into(writer)
+    else:
+        writer.write(str(item))
+#-----------------------------------------------------------------------
+def _render_sanitised(item: _Any, writer: _Writer) -> None:
+    '''Like _render, but str objects are sanitised'''
+    if isinstance(item, str):
+        writer.write(_sanitise(item))
+    else:
+        _render(item, writer)
+#-----------------------------------------------------------------------
+def _walk(items: _Iterable[_Any], visited: set[int],
+          is_end: _Optional[_Callable[['Element'], bool]] = None
+          ) -> _Generator['Element', None, None]:
+    '''Iterates depth first over elements in items and their children
 
-    Parameters
-    ----------
-    item : _Any
-        Item to be maybe collected from
-    visited : set[int]
-        All ids of already collected objects. To prevent infinite loops
-    collected : _Collected
-        previously collected items
-
-    Returns
-    -------
-    tuple[set[int], _Collected]
-        updated visisted and collected
-    '''
-    if (isinstance(item, CollectableElement)
-        and (item_id := id(item)) not in visited):
-        visited.add(item_id)
-        visited, new_collected = item._collect(visited) # type: ignore
-        for old, new in zip(collected, new_collected):
-            for key, sublist in new.items():
-                old[key].extend(sublist)
-    return visited, collected
-#-----------------------------------------------------------------------
-def _collect_iter(items: _Iterable, visited: set[int], collected: _Collected
-                  ) -> tuple[set[int], _Collected]:
-    '''Doing ordered set union thing
+    Uses explicit stack instead of recursion, so nesting depth is not limited
+    by the recursion limit.
 
     Parameters
     ----------
     items : Iterable
-        Items to be checked
-    visited: set[int]
-        Objectes already visited. To prevent infinite recursion
+        Items to be walked through
+    visited : set[int]
+        All ids of already walked elements. Updated in place.
+        To prevent infinite loops and duplicates
+    is_end : Callable[[Element], bool] | None, default None
+        Called after yielding an element. If true, its children are skipped
 
-    Returns
-    -------
-    tuple[dict, dict]
-        unique items
+    Yields
+    ------
+    Element
+        Elements in preorder
     '''
-    for item in items:
-        visited, collected = _collect(item, visited, collected)
-    return visited, collected
+    stack = [iter(items)]
+    while stack:
+        for item in stack[-1]:
+            if isinstance(item, Element) and (item_id := id(item)) not in visited:
+                visited.add(item_id)
+                yield item
+                # Faster than isinstance with abstract base class
+                if ((children := getattr(type(item), '_children', None))
+                    and (is_end is None or not is_end(item))):
+                    stack.append(iter(children(item)))
+                    break
+        else:
+            stack.pop()
 #=======================================================================
 # ELEMENTS BASE CLASSES
 @_dataclass(**_maybeslots)
 class Element:
-    '''Base class for all YAMDOG elements'''
+    '''Base class for all YAMDOG elements
+
+    Elements write their markdown text with render_into
+    and str is made from that'''
+    _changed: int = _field(init = False, default = 0,
+                           repr = False, compare = False)
+    _is_cached: _ClassVar[bool] = False # Rendered via cache in documents
+    _is_stored: _ClassVar[bool] = False # Uses persistent RenderCache
+    #-------------------------------------------------------------------
+    def __init_subclass__(cls, **kwargs) -> None:
+        # Explicit super, because slots make new class
+        super(Element, cls).__init_subclass__(**kwargs)
+        # Subclasses only defining str are rendered with it
+        if '__str__' in vars(cls) and 'render_into' not in vars(cls):
+            cls.render_into = _render_str # type: ignore
     #-------------------------------------------------------------------
     def __add__(self, other):
         return Document([self, other]) # type: ignore
+    #-------------------------------------------------------------------
+    def __str__(self) -> str:
+        buffer = _StringIO()
+        if type(self).render_into is _render_str:
+            # Called from str of subclass, so rendering as the base class
+            _base_render_into(type(self))(self, buffer) # type: ignore
+        else:
+            _render(self, buffer)
+        return buffer.getvalue()
+    #-------------------------------------------------------------------
+    def render_into(self, writer: _Writer) -> None:
+        '''Writes markdown text of the element to the writer
+
+        Parameters
+        ----------
+        writer : Writer
+            Object with method write taking str, e.g. a text file
+        '''
+        writer.write(repr(self))
+    #-------------------------------------------------------------------
+    def invalidate(self):
+        '''Marks the element changed, so that cached renders of it and
+        elements containing it are not reused.
+
+        Mutating methods call this. With render caching, other changes,
+        e.g. table.content[0][1] = 2, are found by comparing to the values
+        at render. Otherwise tables that have had rows appended need this
+        after modifying earlier rows in place'''
+        self._changed = next(_render_stamps)
+        return self
+    #-------------------------------------------------------------------
+    def digest(self) -> _Optional[str]:
+        '''Content digest of the element
+
+        Made from the class and field values, including contained elements,
+        so it is the same across processes for elements that render
+        the same text. None if some value has no stable digest,
+        e.g. an iterator or an object whose str has its memory address.'''
+        return _stable_digest(self, {})
+#-----------------------------------------------------------------------
+_render_stamps = _itertools.count(1) # Ordering of changes and renders
+#-----------------------------------------------------------------------
+def _render_str(self: Element, writer: _Writer) -> None:
+    writer.write(self.__str__())
+#-----------------------------------------------------------------------
+@_cache
+def _base_render_into(cls: type) -> _Callable[[Element, _Writer], None]:
+    '''Nearest render_into of the bases that is not made from str'''
+    return next(render_into for base in cls.__mro__ # Ends at Element
+                if (render_into := vars(base).get('render_into'))
+                not in (None, _render_str))
 #=======================================================================
-@_dataclass(validate = _IS_VALIDATION, **_maybeslots) # type: ignore
+@_dataclass(validate = True, **_maybeslots) # type: ignore
 class StrWrapElement(Element):
     '''Str is by wrapping with prefix and suffix
     '''
     text: _Any
     _markup: _ClassVar[tuple[_Any, _Any]] = ('', '')
     #-------------------------------------------------------------------
-    def __str__(self) -> str:
-        return f'{self._markup[0]}{self.text}{self._markup[1]}'
+    def render_into(self, writer: _Writer) -> None:
+        writer.write(self._markup[0])
+        _render(self.text, writer)
+        writer.write(self._markup[1])
 #=======================================================================
-@_dataclass(validate = _IS_VALIDATION, **_maybeslots) # type: ignore
+@_dataclass(validate = True, **_maybeslots) # type: ignore
 class FlavouredStrWrapElement(Element):
     '''Str wrap where wrapping is based on markup flavour
     '''
@@ -130,16 +290,24 @@ class FlavouredStrWrapElement(Element):
     flavour: Flavour = GITHUB
     _markup: _ClassVar = {}
     #-------------------------------------------------------------------
-    def __str__(self) -> str:
+    def render_into(self, writer: _Writer) -> None:
         left, right = self._markup[self.flavour]
-        return f'{left}{self.text}{right}'
+        writer.write(left)
+        _render(self.text, writer)
+        writer.write(right)
 #=======================================================================
 @_dataclass(**_maybeslots)
 class CollectableElement(Element, _ABC):
     """A base class for all collectable elements"""
-    ...
+    # Render stamp, text, footnote and reference registrations and values
+    # of the fields of the element and of the elements in it, except those
+    # in other kept elements, see set_render_caching
+    _rendered: _Optional[tuple[int, str, tuple[list, ...], list]] = _field(
+        init = False, default = None, repr = False, compare = False)
+    _is_cached: _ClassVar[bool] = True
     @_abstractmethod
-    def _collect(self, visited: set[int]) -> tuple[set[int], _Collected]:
+    def _children(self) -> _Iterable[_Any]:
+        '''Items that may contain further elements'''
         ...
 #=======================================================================
 
@@ -154,15 +322,15 @@ class ContainerElement(CollectableElement):
     def __getattr__(self, attr: str) -> _Any:
         return getattr(self.content, attr)
     #-------------------------------------------------------------------
-    def _collect(self, visited: set[int]) -> tuple[set[int], _Collected]:
-        return _collect(self.content, visited, _empty_collected())
+    def _children(self) -> _Iterable[_Any]:
+        return (self.content,)
 #=======================================================================
 @_dataclass(**_maybeslots)
 class IterableElement(ContainerElement):
     '''Base class for elements that have iterable content'''
     #-------------------------------------------------------------------
-    def _collect(self, visited: set[int]) -> tuple[set[int], _Collected]:
-        return _collect_iter(self.content, visited, _empty_collected())
+    def _children(self) -> _Iterable[_Any]:
+        return self.content
     #-------------------------------------------------------------------
     def __iter__(self):
         return iter(self.content)
@@ -170,7 +338,8 @@ class IterableElement(ContainerElement):
 @_dataclass(**_maybeslots)
 class InlineElement(Element):
     """A marker class to whether element can be treated as inline"""
-    ...
+    # Inline elements are small, so they are cached as part of their parent
+    _is_cached: _ClassVar[bool] = False
 #=======================================================================
 @_dataclass(**_maybeslots)
 class GroupElement(CollectableElement):
@@ -182,7 +351,7 @@ class GroupElement(CollectableElement):
 #=======================================================================
 #=======================================================================
 # Checkbox
-@_dataclass(validate = _IS_VALIDATION, **_maybeslots) # type: ignore
+@_dataclass(validate = True, **_maybeslots) # type: ignore
 class Checkbox(ContainerElement):
     '''[x] Checkbox
 
@@ -198,8 +367,9 @@ class Checkbox(ContainerElement):
     def __bool__(self) -> bool:
         return self.checked
     #-------------------------------------------------------------------
-    def __str__(self) -> str:
-        return (f'[{"x" if self else " "}] {_sanitise_str(self.content)}')
+    def render_into(self, writer: _Writer) -> None:
+        writer.write('[x] ' if self else '[ ] ')
+        _render_sanitised(self.content, writer)
     #-------------------------------------------------------------------
     def __add__(self, other):
         raise TypeError(f"unsupported operand type(s) for +: "
@@ -231,13 +401,15 @@ class CodeBlock(Element):
     text: _Any
     language: _Any = ''
     #-------------------------------------------------------------------
-    def __str__(self) -> str:
+    def render_into(self, writer: _Writer) -> None:
         # Forces potential ` characters to be resolved and undoes unnecessary sanitisation
         text = str(self.text).replace(r'\`', '`')
         mark = ('`' * (n + 1) if (tics := _re_tics.findall(text))
                                   and (n := len(max(tics))) > 2
                 else '```')
-        return f'{mark}{_sanitise(str(self.language))}\n{text}\n{mark}'
+        writer.write(f'{mark}{_sanitise(str(self.language))}\n')
+        writer.write(text)
+        writer.write(f'\n{mark}')
 #=======================================================================
 @_dataclass(**_maybeslots)
 class Comment(StrWrapElement):
@@ -271,17 +443,17 @@ class Footnote(ContainerElement, InlineElement):
     content: Any
         Content to be displayed as the note text
     '''
-    _index: int = _field(init = False, default = 0)
-    #-------------------------------------------------------------------
-    def _collect(self, visited: set[int]) -> tuple[set[int], _Collected]:
-        return _collect(self.content, visited,
-                        (_ListDict(), _ListDict({str(self.content): [self]})))
+    # Set when rendered, so not part of the content
+    _index: int = _field(init = False, default = 0, compare = False)
+    _is_cached: _ClassVar[bool] = False
     #-------------------------------------------------------------------
-    def __str__(self) -> str:
-        return f'[^{self._index}]'
+    def render_into(self, writer: _Writer) -> None:
+        if (index := _render_index.get()) is not None:
+            self._index = index.footnote(self)
+        writer.write(f'[^{self._index}]')
 #=======================================================================
 # Heading
-@_dataclass(validate = _IS_VALIDATION, **_maybeslots) # type: ignore
+@_dataclass(validate = True, **_maybeslots) # type: ignore
 class Heading(ContainerElement):
     '''One line of text to separate sections from each other
 
@@ -309,20 +481,23 @@ class Heading(ContainerElement):
         if self.level < 1 or self.level > 6:
             raise ValueError(f'Level must be greater that 0, not {self.level}')
     #-------------------------------------------------------------------
-    def __str__(self) -> str:
-        text = str(self.content)
+    def render_into(self, writer: _Writer) -> None:
         toccomment = '' if self.in_TOC else ' <!-- omit in toc -->'
 
         if self.alt_style and self.level in (1, 2):
-            return (text + toccomment +'\n'
-                    + ('=' if self.level == 1 else '-') * len(text))
-        return self.level * "#" + ' ' + text + toccomment
+            text = str(self.content)
+            writer.write(text + toccomment +'\n'
+                         + ('=' if self.level == 1 else '-') * len(text))
+        else:
+            writer.write(self.level * "#" + ' ')
+            _render(self.content, writer)
+            writer.write(toccomment)
 #=======================================================================
 @_dataclass(**_maybeslots)
 class HRule(Element):
     '''Simple a horizontal line'''
-    def __str__(self) -> str:
-        return '---'
+    def render_into(self, writer: _Writer) -> None:
+        writer.write('---')
 #=======================================================================
 @_dataclass(**_maybeslots)
 class Image(Element):
@@ -339,9 +514,15 @@ class Image(Element):
     alt_text: _Any = 'image'
     caption: _Any = None
     #-------------------------------------------------------------------
-    def __str__(self) -> str:
-        return (f'![{self.alt_text}]({self.path})' if self.caption is None else
-                f'![{self.alt_text}]({self.path})\n{self.caption}')
+    def render_into(self, writer: _Writer) -> None:
+        writer.write('![')
+        _render(self.alt_text, writer)
+        writer.write('](')
+        _render(self.path, writer)
+        writer.write(')')
+        if self.caption is not None:
+            writer.write('\n')
+            _render(self.caption, writer)
 #=======================================================================
 @_dataclass(**_maybeslots)
 class Link(InlineElement, CollectableElement):
@@ -359,17 +540,29 @@ class Link(InlineElement, CollectableElement):
     target: _Any
     content: _Any = None
     title: _Any = None
-    _index: int = _field(init = False, default = 0)
+    # Set when rendered, so not part of the content
+    _index: int = _field(init = False, default = 0, compare = False)
     #-------------------------------------------------------------------
-    def _collect(self, visited: set[int]) -> tuple[set[int], _Collected]:
-        link = (_ListDict() if self.title is None
-                else _ListDict({(str(self.target), str(self.title)): [self]}))
-        return _collect(self.content, visited, (link, _ListDict()))
+    def _children(self) -> _Iterable[_Any]:
+        return (self.content,)
     #-------------------------------------------------------------------
-    def __str__(self) -> str:
-        return (f'<{self.target}>' if self.content is None else
-                (f'[{self.content}][{self._index}]' if self._index else
-                 f'[{self.content}]({self.target})'))
+    def render_into(self, writer: _Writer) -> None:
+        if (self.title is not None
+            and (index := _render_index.get()) is not None):
+            self._index = index.reference(self)
+        if self.content is None:
+            writer.write('<')
+            _render(self.target, writer)
+            writer.write('>')
+            return
+        writer.write('[')
+        _render(self.content, writer)
+        if self._index:
+            writer.write(f'][{self._index}]')
+        else:
+            writer.write('](')
+            _render(self.target, writer)
+            writer.write(')')
 #=======================================================================
 class ListingStyle(_Enum):
     '''Styles of listing'''
@@ -379,7 +572,7 @@ class ListingStyle(_Enum):
     DEFINITION = (_partial(_itertools.repeat, ': '),)
 ORDERED, UNORDERED, DEFINITION = ListingStyle
 #-----------------------------------------------------------------------
-@_dataclass(validate = _IS_VALIDATION, **_maybeslots) # type: ignore
+@_dataclass(validate = True, **_maybeslots) # type: ignore
 class Listing(IterableElement):
     '''List of items
 
@@ -396,19 +589,67 @@ class Listing(IterableElement):
     def __getattr__(self, attr: str) -> _Any:
         return getattr(self.content, attr)
     #-------------------------------------------------------------------
-    def __str__(self) -> str:
-        output = []
+    def _children(self) -> _Iterable[_Any]:
+        if isinstance(self.content, _Iterator): # Items can be iterated once
+            return ()
+        return self.content
+    #-------------------------------------------------------------------
+    @classmethod
+    def from_jsonl(cls,
+                   path: _pathlib.Path | str,
+                   keys: str | _Iterable | None = None,
+                   style: ListingStyle = UNORDERED,
+                   limit: _Optional[int] = None,
+                   *,
+                   separator: str = ', ',
+                   stream: bool = False,
+                   workers: int = 1):
+        '''Assembles Listing from JSON Lines file, one item per record
+
+        Parameters
+        ----------
+        path : Path | str
+            Path to the JSON Lines file. Blank lines are skipped
+        keys : str | Iterable | None, default None
+            Key of the value that is the item, or keys of the values
+            joined to the item. By default all keys of the first record
+        style : ListingStyle, default UNORDERED
+            ORDERED, UNORDERED or DEFINITION
+        limit : int | None, default None
+            Maximum number of items read from the start of the file
+        separator : str, default ', '
+            Separator joining the values of several keys
+        stream : bool, default False
+            Instead of reading the items into memory, content is an
+            iterator reading the file while rendering. Listing can then
+            be rendered only once
+        workers : int, default 1
+            Number of processes parsing parts of the file in parallel
+        '''
+        keys = ([keys] if isinstance(keys, str) else
+                _jsonl_keys(path) if keys is None else list(keys))
+        chunks = _jsonl_chunks(path, keys, limit, workers)
+        if len(keys) == 1:
+            items: _Iterator = _itertools.chain.from_iterable(
+                columns[0] for columns in chunks)
+        else:
+            items = (separator.join(map(str, row))
+                     for columns in chunks for row in zip(*columns))
+        return cls(items if stream else list(items), style)
+    #-------------------------------------------------------------------
+    def render_into(self, writer: _Writer) -> None:
+        separator = ''
         for item, prefix in zip(self.content, self.style.value[0]()):
+            writer.write(separator + prefix)
+            separator = '\n'
             if (isinstance(item, tuple)
                 and len(item) == 2
                 and isinstance(item[1], Listing)):
-                output.append(prefix + str(item[0]))
-                output.append(_RAW_INDENT
-                              + str(item[1]).replace('\n', '\n'+ _RAW_INDENT))
+                _render(item[0], writer)
+                writer.write('\n' + _RAW_INDENT)
+                item[1].render_into(_IndentWriter(writer, _RAW_INDENT))
             else:
-                output.append(prefix
-                              + str(item).replace('\n', '\n'+ ' '* len(prefix)))
-        return '\n'.join(output)
+                _render(item, _IndentWriter(writer, ' ' * len(prefix)))
 #-----------------------------------------------------------------------
 def make_checklist(items: _Iterable[tuple[_Any, bool]]) -> Listing:
     '''Assembles a Listing of checkboxes from iterable
@@ -423,7 +664,7 @@ def make_checklist(items: _Iterable[tuple[_Any, bool]]) -> Listing:
         Unorderd listing containing checkboxes'''
     return Listing([Checkbox(*item) for item in items], UNORDERED)
 #=======================================================================
-@_dataclass(validate = _IS_VALIDATION, **_maybeslots) # type: ignore
+@_dataclass(validate = True, **_maybeslots) # type: ignore
 class Math(FlavouredStrWrapElement, InlineElement):
     '''Inline KaTeX math notation
 
@@ -437,7 +678,7 @@ class Math(FlavouredStrWrapElement, InlineElement):
     _markup: _ClassVar = {GITHUB: ('$', '$'),
                           GITLAB: ('$`', '`$')}
 #=======================================================================
-@_dataclass(validate = _IS_VALIDATION, **_maybeslots) # type: ignore
+@_dataclass(validate = True, **_maybeslots) # type: ignore
 class MathBlock(FlavouredStrWrapElement):
     '''KaTeX math notation in a block
 
@@ -452,7 +693,7 @@ class MathBlock(FlavouredStrWrapElement):
                           GITLAB: ('```math\n', '\n```')}
 #=======================================================================
 # Paragraph
-@_dataclass(validate = _IS_VALIDATION, **_maybeslots) # type: ignore
+@_dataclass(validate = True, **_maybeslots) # type: ignore
 class Paragraph(IterableElement):
     '''Section of text
 
@@ -466,16 +707,20 @@ class Paragraph(IterableElement):
     content: list[_Any] = _field(default_factory = list)
     separator: str = ''
     #-------------------------------------------------------------------
-    def __str__(self) -> str:
-        return self.separator.join(map(_sanitise_str, self.content))
+    def render_into(self, writer: _Writer) -> None:
+        separator = ''
+        for item in self.content:
+            writer.write(separator)
+            separator = self.separator
+            _render_sanitised(item, writer)
     #-------------------------------------------------------------------
     def __iadd__(self, other):
         if isinstance(other, InlineElement):
             self.content.append(other)
-            return self
+            return self.invalidate()
         if isinstance(other, Paragraph):
             self.content += other.content
-            return self
+            return self.invalidate()
         raise TypeError(f"+= has not been implemented for Paragraph with object"
                         f" {repr(other)} type '{type(other).__name__}'")
 #=======================================================================
@@ -493,11 +738,13 @@ class PDF(Image):
         Caption text under thie image
     '''
     #-------------------------------------------------------------------
-    def __str__(self) -> str:
+    def render_into(self, writer: _Writer) -> None:
         path = str(self.path)
-        image = (f'<object data="{path}" type="application/pdf">'
-                 f'<embed src="{path}"></embed></object>')
-        return image if self.caption is None else image + f'\n{self.caption}'
+        writer.write(f'<object data="{path}" type="application/pdf">'
+                     f'<embed src="{path}"></embed></object>')
+        if self.caption is not None:
+            writer.write('\n')
+            _render(self.caption, writer)
 #=======================================================================
 @_dataclass(**_maybeslots)
 class Quote(ContainerElement):
@@ -509,8 +756,9 @@ class Quote(ContainerElement):
         Content to be wrapped in a quote block
     '''
     #-------------------------------------------------------------------
-    def __str__(self) -> str:
-        return '> ' + str(self.content).replace('\n', '\n> ')
+    def render_into(self, writer: _Writer) -> None:
+        writer.write('> ')
+        _render(self.content, _IndentWriter(writer, '> '))
 #-----------------------------------------------------------------------
 QuoteBlock = Quote # some backwards compatibility
 #=======================================================================
@@ -523,8 +771,8 @@ class Raw(InlineElement):
     content: Any
     '''
     content: _Any
-    def __str__(self) -> str:
-        return str(self.content)
+    def render_into(self, writer: _Writer) -> None:
+        _render(self.content, writer)
 #=======================================================================
 # Table
 class Align(_Enum):
@@ -535,6 +783,9 @@ class Align(_Enum):
     LEFT = (lambda width: f':{"-" * (width - 1)}',)
     CENTER = (lambda width: f':{"-" * (width - 2)}:',)
     RIGHT = (lambda width: f'{"-" * (width - 1)}:',)
+    #-------------------------------------------------------------------
+    def __reduce_ex__(self, protocol: _Any): # Lambdas cannot be pickled
+        return getattr, (self.__class__, self.name)
 
 LEFT, CENTER, RIGHT = Align
 #-----------------------------------------------------------------------
@@ -569,9 +820,833 @@ def _pad(items: _Iterable[str],
                (f'{item:>{width}}' if align == RIGHT else
                 (f'{item:<{width}}')))
 #-----------------------------------------------------------------------
+_align_specs = {LEFT: '<', CENTER: '^', RIGHT: '>'} # Format spec alignments
+#-----------------------------------------------------------------------
 _table_translation = str.maketrans({'|': '&#124;',
                                     '\n': '<br><br>'})
-@_dataclass(validate = _IS_VALIDATION, **_maybeslots) # type: ignore
+#-----------------------------------------------------------------------
+def _is_array(column: _Any) -> _TypeGuard['_np.ndarray']:
+    return _np is not None and isinstance(column, _np.ndarray)
+#-----------------------------------------------------------------------
+def _escape_cells(strings: list[str]) -> list[str]:
+    '''Escapes cells of a row or column, translating only if needed'''
+    text = '\0'.join(strings)
+    if '|' in text or '\n' in text:
+        return [cell.translate(_table_translation) for cell in strings]
+    return strings
+#-----------------------------------------------------------------------
+def _transpose(rows: list[list[str]]) -> list[list[str]]:
+    '''Columns of rows, shorter rows padded with empty cells'''
+    if not rows:
+        return []
+    n_columns = max(map(len, rows))
+    if min(map(len, rows)) < n_columns:
+        rows = [row + [''] * (n_columns - len(row)) for row in rows]
+    return [list(map(_itemgetter(index), rows))
+            for index in range(n_columns)]
+#-----------------------------------------------------------------------
+_si_prefixes = ('y', 'z', 'a', 'f', 'p', 'n', 'µ', 'm',
+                '', 'k', 'M', 'G', 'T', 'P', 'E', 'Z', 'Y')
+#-----------------------------------------------------------------------
+def _parse_number(text: str) -> _Any:
+    '''Number from text, e.g. CSV cell, or the text if it is not one'''
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+#-----------------------------------------------------------------------
+def _si_spec(spec: str) -> str:
+    '''Format spec for the scaled number from SI spec ending with S'''
+    spec = spec[:-1]
+    if not spec or spec[-1].isdigit() or spec[-1] == ',':
+        spec += 'f' if '.' in spec else 'g'
+    return spec
+#-----------------------------------------------------------------------
+def _si_cell(value: _Any, spec: str) -> str:
+    '''Number scaled to SI prefix and formatted by spec'''
+    if isinstance(value, bool) or not isinstance(value, _Real):
+        return str(value)
+    if not value or not _math.isfinite(value):
+        return format(value, spec)
+    exponent = min(max(_math.floor(_math.log10(abs(value)) / 3), -8), 8)
+    text = format(value / 1000.0 ** exponent, spec)
+    if (exponent < 8 # Rounded up to the next prefix, e.g. 999.96 to 1000.0
+        and abs(float(text.replace(',', '').replace('_', ''))) >= 1000):
+        exponent += 1
+        text = format(value / 1000.0 ** exponent, spec)
+    return text + _si_prefixes[exponent + 8]
+#-----------------------------------------------------------------------
+def _format_cell(value: _Any, spec: _Optional[str]) -> str:
+    '''Cell as str, formatted by spec if it is a number'''
+    if spec is None:
+        return str(value)
+    if isinstance(value, str):
+        value = _parse_number(value)
+    if spec[-1:] == 'S':
+        return _si_cell(value, _si_spec(spec))
+    try:
+        return format(value, spec)
+    except (TypeError, ValueError): # Not a number
+        return str(value)
+#-----------------------------------------------------------------------
+def _format_cells(values: _Any, spec: _Optional[str]) -> list[str]:
+    '''Cells of a column as str, formatted by spec in bulk
+
+    NumPy arrays are scaled to SI prefixes as whole'''
+    if spec is None:
+        return list(map(str, values))
+    if _is_array(values) and values.dtype.kind in 'biuf':
+        if spec[-1:] == 'S':
+            spec = _si_spec(spec)
+            numbers = values.astype(float)
+            with _np.errstate(divide = 'ignore', invalid = 'ignore'):
+                exponents = _np.floor(_np.log10(_np.abs(numbers)) / 3)
+            exponents = _np.nan_to_num(exponents, nan = 0., posinf = 0.,
+                                       neginf = 0.).clip(-8, 8)
+            scaled = numbers / 1000.0 ** exponents
+            cells = list(map(_add,
+                             map(format, scaled.tolist(),
+                                 _itertools.repeat(spec)),
+                             map(_si_prefixes.__getitem__,
+                                 (exponents.astype(int) + 8).tolist())))
+            # Values that may round up to the next prefix
+            for index in _np.flatnonzero((_np.abs(scaled) >= 999.)
+                                         & (exponents < 8)).tolist():
+                cells[index] = _si_cell(numbers[index].item(), spec)
+            return cells
+        values = values.tolist()
+    if spec[-1:] != 'S':
+        try: # Fast path for columns of only numbers
+            return list(map(format, values, _itertools.repeat(spec)))
+        except (TypeError, ValueError):
+            pass
+    return [_format_cell(value, spec) for value in values]
+#-----------------------------------------------------------------------
+def _format_row(row: _Iterable, formats: _Any) -> list[str]:
+    '''Cells of a row as str, formatted by the format specs of Table'''
+    if not formats:
+        return [str(cell) for cell in row]
+    specs = (_itertools.repeat(formats) if isinstance(formats, str) else
+             _itertools.chain(formats, _itertools.repeat(None)))
+    return [_format_cell(cell, spec) for cell, spec in zip(row, specs)]
+#-----------------------------------------------------------------------
+def _column_strings(column: _Iterable, spec: _Optional[str] = None) -> _Any:
+    '''Cells of one column converted to escaped strings
+
+    NumPy arrays are converted as whole and numbers need no escaping.
+    Encoded columns are formatted per distinct value'''
+    if isinstance(column, EncodedColumn):
+        return EncodedColumn(column.codes,
+                             _escape_cells(_format_cells(column.values, spec)))
+    if spec is not None:
+        return _escape_cells(_format_cells(column, spec))
+    if _is_array(column):
+        dtype = column.dtype # type: ignore
+        if dtype == _np.float64: # Python float str is faster and same
+            return list(map(str, column.tolist())) # type: ignore
+        if dtype.kind in 'biufmM':
+            return column.astype(str).tolist() # type: ignore
+        if dtype.kind == 'U' and not ((_np.char.find(column, '|') >= 0).any()
+                                      or (_np.char.find(column, '\n') >= 0
+                                          ).any()):
+            return column.tolist() # type: ignore
+        column = column.tolist() # type: ignore
+    return _escape_cells(list(map(str, column)))
+#-----------------------------------------------------------------------
+def _pad_column(strings: list[str], width: int, align: Align) -> list[str]:
+    '''Pads all cells of the column to width like _pad'''
+    if align == CENTER: # str.center places odd space differently
+        return [f'{cell:^{width}}' for cell in strings]
+    if align == RIGHT:
+        return [cell.rjust(width) for cell in strings]
+    return [cell.ljust(width) for cell in strings]
+#-----------------------------------------------------------------------
+def _column_widths(header: list[str], widths: list[int]) -> list[int]:
+    '''Widths of the columns from the padded header and the widths of the
+    cells, which may have fewer columns'''
+    return [max(len(cell), width, 3) for cell, width
+            in zip(header, _itertools.chain(widths, _itertools.repeat(0)))]
+#-----------------------------------------------------------------------
+def _table_head(header: list[str],
+                widths: _Optional[list[int]],
+                aligns: list[Align]) -> str:
+    '''Header and alignment lines of table. Compact if widths is None'''
+    if widths is None:
+        return ('|'.join(header) + '\n'
+                + '|'.join(align.value[0](3) for align in aligns))
+    return ('| ' + ' | '.join(_pad(header, widths, aligns)) + ' |\n| '
+            + ' | '.join(align.value[0](width)
+                         for align, width in zip(aligns, widths)) + ' |')
+#-----------------------------------------------------------------------
+def _line_format(widths: list[int], aligns: list[Align]) -> str:
+    '''Format string padding a row of escaped cells to a table line'''
+    return ('| ' + ' | '.join(f'{{:{_align_specs[align]}{width}}}'
+                              for align, width in zip(aligns, widths))
+            + ' |')
+#-----------------------------------------------------------------------
+def _page_size(header: list[int], widths: list[int], n_rows: int,
+               n_chars: int, compact: bool) -> int:
+    '''Number of characters in table rendered with computed widths from
+    header cell lengths, escaped cell widths and characters of the rows'''
+    n_columns = max(len(header), len(widths))
+    if compact: # Header, alignment and rows lines with newlines
+        return (sum(header) + 5 * n_columns - 1
+                + n_chars + n_rows * n_columns)
+    line = sum(max(length, width, 3) for length, width
+               in _itertools.zip_longest(header, widths, fillvalue = 0))
+    return (n_rows + 2) * (line + 3 * n_columns + 1) + n_rows + 1
+#-----------------------------------------------------------------------
+_ROW_CHUNK = 4096 # Rows written at once
+#-----------------------------------------------------------------------
+def _format_block(n_rows: int,
+                  columns: list[_Any],
+                  widths: _Optional[list[int]],
+                  aligns: list[Align]) -> str:
+    '''Table body lines from columns of escaped cells, each line
+    preceded by newline. Compact if widths is None
+
+    Encoded columns are padded per distinct value'''
+    if not n_rows:
+        return ''
+    if not aligns:
+        return ('\n' if widths is None else '\n|  |') * n_rows
+    columns = columns + [[]] * (len(aligns) - len(columns))
+    last = len(columns) - 1
+    padded = []
+    for index, column in enumerate(columns):
+        values = column.values if isinstance(column, EncodedColumn) else column
+        if widths is None:
+            fill = ''
+        else: # Outer borders to the first and last columns
+            prefix = '| ' if index == 0 else ''
+            suffix = ' |' if index == last else ''
+            values = _pad_column(values, widths[index], aligns[index])
+            if prefix or suffix:
+                values = [prefix + value + suffix for value in values]
+            fill = prefix + ' ' * widths[index] + suffix
+        if isinstance(column, EncodedColumn):
+            values = list(map(values.__getitem__, column.codes))
+        padded.append(values + [fill] * (n_rows - len(values)))
+    return '\n' + '\n'.join(map((' | ', '|')[widths is None].join,
+                                 zip(*padded)))
+#-----------------------------------------------------------------------
+def _row_blocks(columns: list[list[str]], n_rows: int
+                ) -> _Iterator[tuple[int, list[list[str]]]]:
+    '''Columns sliced to blocks of rows'''
+    for start in range(0, n_rows, _ROW_CHUNK):
+        yield (min(_ROW_CHUNK, n_rows - start),
+               [column[start:start + _ROW_CHUNK] for column in columns])
+#-----------------------------------------------------------------------
+def _executor(workers: int) -> _Executor:
+    '''Thread pool on free-threaded Python and otherwise process pool'''
+    if not getattr(_sys, '_is_gil_enabled', lambda: True)():
+        return _ThreadPoolExecutor(workers)
+    return _ProcessPoolExecutor(workers)
+#-----------------------------------------------------------------------
+def _write_blocks(writer: _Writer,
+                  blocks: _Iterable[tuple[int, list[list[str]]]],
+                  widths: _Optional[list[int]],
+                  aligns: list[Align],
+                  workers: int = 1) -> None:
+    '''Writes blocks of rows formatted by _format_block in order
+
+    With more than one worker the blocks are formatted in a pool, with
+    at most two blocks per worker waiting at a time'''
+    if workers <= 1:
+        for n_rows, columns in blocks:
+            writer.write(_format_block(n_rows, columns, widths, aligns))
+        return
+    with _executor(workers) as pool:
+        pending: _deque[_Future] = _deque()
+        for n_rows, columns in blocks:
+            pending.append(pool.submit(_format_block,
+                                       n_rows, columns, widths, aligns))
+            if len(pending) >= 2 * workers:
+                writer.write(pending.popleft().result())
+        while pending:
+            writer.write(pending.popleft().result())
+#-----------------------------------------------------------------------
+_SPILL_ROWS = 1 << 16 # Rows from iterators kept in memory while measuring
+#-----------------------------------------------------------------------
+def _spill_rows(spill: _TextIO, n_rows: int, columns: list[list[str]]
+                ) -> None:
+    '''Writes escaped rows one per line with cells separated by |
+
+    Escaped cells have no | or newline'''
+    if columns:
+        spill.write('\n'.join(map('|'.join, zip(*columns))) + '\n')
+    else:
+        spill.write('\n' * n_rows)
+#-----------------------------------------------------------------------
+def _unspill_rows(spill: _TextIO
+                  ) -> _Iterator[tuple[int, list[list[str]]]]:
+    '''Reads rows written by _spill_rows back as chunks of columns'''
+    spill.seek(0)
+    rest = ''
+    # Splitting only on \n, since cells may have other line breaks
+    while block := spill.read(_SPILL_CHUNK):
+        *lines, rest = (rest + block).split('\n')
+        for start in range(0, len(lines), _ROW_CHUNK):
+            rows = [line.split('|')
+                    for line in lines[start:start + _ROW_CHUNK]]
+            yield len(rows), _transpose(rows)
+#-----------------------------------------------------------------------
+def _fitting(text: str, width: int) -> int:
+    '''Number of leading characters of text fitting in width when
+    escaped, at least one'''
+    length = 0
+    for index, char in enumerate(text):
+        length += len(char.translate(_table_translation))
+        if length > width:
+            return index or 1
+    return len(text)
+#-----------------------------------------------------------------------
+def _truncate(cell: str, width: int) -> list[str]:
+    if len(escaped := cell.translate(_table_translation)) <= width:
+        return [escaped]
+    return [cell[:_fitting(cell, width - 1)].translate(_table_translation)
+            + '…']
+#-----------------------------------------------------------------------
+def _wrap(cell: str, width: int) -> list[str]:
+    if len(escaped := cell.translate(_table_translation)) <= width:
+        return [escaped]
+    lines = []
+    for line in cell.split('\n'):
+        while True:
+            end = _fitting(line, width)
+            lines.append(line[:end].translate(_table_translation))
+            if not (line := line[end:]):
+                break
+    return lines
+#-----------------------------------------------------------------------
+def _expand(cell: str, width: int) -> list[str]:
+    return [cell.translate(_table_translation)]
+#-----------------------------------------------------------------------
+class Overflow(_Enum):
+    '''Handling of cells wider than the column in TableSchema'''
+    # Wrapped in tuple like Align so that functions are not descriptors
+    TRUNCATE = (_truncate,) # Cut and marked with …
+    WRAP = (_wrap,) # Continued on following lines of the table
+    EXPAND = (_expand,) # Written whole, breaking alignment of the row
+
+TRUNCATE, WRAP, EXPAND = Overflow
+#-----------------------------------------------------------------------
+@_dataclass(validate = True, **_maybeslots) # type: ignore
+class TableSchema:
+    '''Fixed column widths for Table
+
+    With a schema the widths are known before the rows, so Table renders
+    the rows one at a time as they are iterated, e.g. from a generator.
+
+    Parameters
+    ----------
+    widths: Iterable[int]
+        Widths of the columns. Widened to fit header cells and alignment
+        markers. Rows and header may have at most this many cells
+    overflow: Overflow, default TRUNCATE
+        How cells wider than the column are handled.
+        TRUNCATE cuts the cell and ends it with …,
+        WRAP continues the cell on following lines of the table
+        with the other cells of the row empty and
+        EXPAND writes the cell whole, so that the row is not aligned
+    '''
+    widths: _Iterable[int]
+    overflow: Overflow = TRUNCATE
+#-----------------------------------------------------------------------
+_code_types = ('B', 'H', 'I', 'L', 'Q') # Unsigned array types by size
+#-----------------------------------------------------------------------
+class EncodedColumn(_Sequence):
+    '''Dictionary encoded table column for Columns
+
+    Cells are stored as codes indexing a table of distinct values, so
+    that repeated values, e.g. categories, take only the size of the
+    code. Table escapes, measures and pads each distinct value once.
+    Iterating gives the values.
+
+    Parameters
+    ----------
+    codes: Iterable[int]
+        Indices to values. Stored as array of the smallest unsigned type
+        that fits the number of values
+    values: Sequence[str]
+        Distinct values. Column width is computed from all of them
+    '''
+    __slots__ = ('codes', 'values')
+    def __init__(self, codes: _Iterable[int], values: _Sequence[str]) -> None:
+        self.values = list(values)
+        for typecode in _code_types:
+            if len(self.values) <= 1 << 8 * _array(typecode).itemsize:
+                break
+        if _is_array(codes): # Copied as buffer
+            codes = _array(typecode, codes.astype(typecode, # type: ignore
+                                                  copy = False).tobytes())
+        elif not (isinstance(codes, _array) and codes.typecode == typecode):
+            codes = _array(typecode, codes)
+        self.codes = codes
+    #-------------------------------------------------------------------
+    @classmethod
+    def encode(cls, cells: _Iterable) -> 'EncodedColumn':
+        '''Encodes cells by their str, so cells are converted to str'''
+        index: dict[str, int] = {}
+        codes = _array('I', [index.setdefault(cell, len(index))
+                             for cell in map(str, cells)])
+        return cls(codes, list(index))
+    #-------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.codes)
+    #-------------------------------------------------------------------
+    def __getitem__(self, key: int | slice) -> _Any:
+        if isinstance(key, slice): # Values are shared
+            return EncodedColumn(self.codes[key], self.values)
+        return self.values[self.codes[key]]
+    #-------------------------------------------------------------------
+    def __iter__(self) -> _Iterator[str]:
+        return map(self.values.__getitem__, self.codes)
+    #-------------------------------------------------------------------
+    def __eq__(self, other: _Any) -> bool:
+        return (isinstance(other, EncodedColumn)
+                and len(self) == len(other)
+                and list(self) == list(other))
+    #-------------------------------------------------------------------
+    def __repr__(self) -> str:
+        return (f'{self.__class__.__name__}({self.codes!r}, '
+                f'{self.values!r})')
+#-----------------------------------------------------------------------
+class Columns(_Sequence):
+    '''Column oriented content for Table
+
+    Table converts and pads the cells column by column, vectorised for
+    NumPy arrays. As a sequence it has rows, shorter columns padded with
+    empty cells, and it equals sequences of the same rows.
+
+    Parameters
+    ----------
+    columns: Iterable[Iterable]
+        Columns of the table, e.g. lists or NumPy arrays. Other iterables
+        are collected to lists.
+    '''
+    __slots__ = ('columns',)
+    def __init__(self, columns: _Iterable[_Iterable[_Any]]) -> None:
+        self.columns: list[_Sequence | '_np.ndarray'] = [
+            column if isinstance(column, _Sequence) or _is_array(column)
+            else list(column)
+            for column in columns]
+    #-------------------------------------------------------------------
+    def __len__(self) -> int:
+        return max(map(len, self.columns), default = 0)
+    #-------------------------------------------------------------------
+    def __iter__(self) -> _Iterator[tuple]:
+        return _itertools.zip_longest(*self.columns, fillvalue = '')
+    #-------------------------------------------------------------------
+    def __getitem__(self, index: int | slice) -> _Any:
+        n_rows = len(self)
+        if isinstance(index, slice):
+            if all(len(column) == n_rows for column in self.columns):
+                return Columns([column[index] for column in self.columns])
+            rows = [self[row] for row in range(*index.indices(n_rows))]
+            return Columns(map(list, zip(*rows)) if rows
+                           else [[] for _ in self.columns])
+        if index < 0:
+            index += n_rows
+        if not 0 <= index < n_rows:
+            raise IndexError('Columns index out of range')
+        return tuple(column[index] if index < len(column) else ''
+                     for column in self.columns)
+    #-------------------------------------------------------------------
+    def __eq__(self, other: _Any) -> bool:
+        if isinstance(other, Columns):
+            return (len(self.columns) == len(other.columns)
+                    and all(list(column) == list(other_column)
+                            for column, other_column
+                            in zip(self.columns, other.columns)))
+        if isinstance(other, _Sequence) and not isinstance(other, str):
+            return (len(self) == len(other)
+                    and all(list(row) == list(other_row)
+                            for row, other_row in zip(self, other)))
+        return NotImplemented
+    #-------------------------------------------------------------------
+    def append(self, row: _Iterable) -> None:
+        '''Appends row to the columns
+
+        Columns that are not lists, e.g. NumPy arrays, are converted to lists
+        '''
+        cells = list(row)
+        n_rows = len(self)
+        self.columns.extend([] for _ in range(len(cells) - len(self.columns)))
+        cells.extend([''] * (len(self.columns) - len(cells)))
+        for index, column in enumerate(self.columns):
+            if not isinstance(column, list):
+                self.columns[index] = column = list(column)
+            column.extend([''] * (n_rows - len(column)))
+            column.append(cells[index])
+    #-------------------------------------------------------------------
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.columns!r})'
+    #-------------------------------------------------------------------
+    def _cells(self) -> _Iterable[_Any]:
+        '''Cells that may be elements, i.e. not in numeric arrays'''
+        for column in self.columns:
+            if isinstance(column, EncodedColumn):
+                continue
+            if not _is_array(column) or column.dtype.kind == 'O':
+                yield from column
+#-----------------------------------------------------------------------
+_CSV_CHUNK = 1 << 22 # Bytes of CSV parsed at once
+#-----------------------------------------------------------------------
+def _csv_line_end(data: _Any, start: int, target: int, quote: bytes) -> int:
+    '''Offset after the first line break from target on that is not
+    inside quotes, counting quotes from row start at start'''
+    odd = data[start:target].count(quote) & 1 if quote else 0
+    position = target
+    while (newline := data.find(b'\n', position)) != -1:
+        if quote:
+            odd ^= data[position:newline].count(quote) & 1
+        if not odd:
+            return newline + 1
+        position = newline + 1
+    return len(data)
+#-----------------------------------------------------------------------
+def _csv_parse(data: _Any, start: int, end: int, encoding: str,
+               csvkwargs: dict[str, _Any]) -> list[list[str]]:
+    return list(_csv.reader(_StringIO(data[start:end].decode(encoding),
+                                      newline = ''), **csvkwargs))
+#-----------------------------------------------------------------------
+def _csv_stats(data: _Any, start: int, end: int, encoding: str,
+               csvkwargs: dict[str, _Any], skip: bool = False
+               ) -> tuple[list[str], int, list[int]]:
+    '''Header if skipped, number of rows and maximum escaped cell widths
+    of the columns'''
+    rows = _csv_parse(data, start, end, encoding, csvkwargs)
+    header = rows.pop(0) if skip and rows else []
+    return header, len(rows), [max(map(len, _escape_cells(column)))
+                               for column in _transpose(rows)]
+#-----------------------------------------------------------------------
+def _csv_stats_worker(path: str, start: int, end: int, encoding: str,
+                      csvkwargs: dict[str, _Any], skip: bool
+                      ) -> tuple[list[str], int, list[int]]:
+    '''_csv_stats in a worker process'''
+    with (open(path, 'rb') as file,
+          _mmap.mmap(file.fileno(), 0, access = _mmap.ACCESS_READ) as data):
+        return _csv_stats(data, start, end, encoding, csvkwargs, skip)
+#-----------------------------------------------------------------------
+def _csv_columns(path: _pathlib.Path | str, header: bool, encoding: str,
+                 csvkwargs: dict[str, _Any]
+                 ) -> tuple[list[str], int, list[list[str]]]:
+    '''Header if read, number of rows and columns of CSV file'''
+    with open(path, 'r', encoding = encoding, newline = '') as file:
+        rows = list(_csv.reader(file, **csvkwargs))
+    head = rows.pop(0) if header and rows else []
+    return head, len(rows), _transpose(rows)
+#-----------------------------------------------------------------------
+def _csv_paths(paths: _pathlib.Path | str | _Iterable[_pathlib.Path | str]
+               ) -> list[_pathlib.Path | str]:
+    '''Paths from glob pattern, path or iterable of paths'''
+    if isinstance(paths, str):
+        if any(char in paths for char in '*?['):
+            return sorted(_glob.glob(paths, recursive = True))
+        return [paths]
+    if isinstance(paths, _pathlib.Path):
+        return [paths]
+    return list(paths)
+#-----------------------------------------------------------------------
+class CSVRows:
+    '''Rows of a CSV file read via memory map without keeping them
+
+    Ingest parses the file in chunks split on row boundaries and keeps
+    only the byte offsets of the chunks and the maximum cell widths of
+    the columns. Table renders the rows streaming them chunk by chunk
+    from the file. If the file has changed, it is scanned again.
+
+    Parameters
+    ----------
+    path : Path | str
+        Path to the CSV file
+    header : bool, default False
+        Whether first row is header. It is then in attribute header and
+        not in the rows
+    encoding : str, default 'utf8'
+        Encoding of the file. Chunks are split on byte level, so
+        encodings where newline is not b'\\n' are read in one chunk
+    workers : int, default 1
+        Number of processes to parse the chunks with
+    chunk_size : int, default 4 MiB
+        Approximate size of the parsed chunks in bytes
+    csvkwargs
+        Passed to csv.reader
+    '''
+    __slots__ = ('path', 'encoding', 'workers', 'chunk_size', 'csvkwargs',
+                 'header', 'offsets', 'widths', 'n_rows', '_stat', '_skip')
+    def __init__(self,
+                 path: _pathlib.Path | str,
+                 header: bool = False,
+                 *,
+                 encoding: str = 'utf8',
+                 workers: int = 1,
+                 chunk_size: int = _CSV_CHUNK,
+                 **csvkwargs: _Any) -> None:
+        self.path = _pathlib.Path(path)
+        self.encoding = encoding
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.csvkwargs = csvkwargs
+        self._skip = header
+        self._scan()
+    #-------------------------------------------------------------------
+    def _quote(self) -> _Optional[bytes]:
+        '''Quote character as bytes if the rows can be split by counting
+        quotes, b'' if there are no quotes and None if not splittable'''
+        if '\n'.encode(self.encoding) != b'\n':
+            return None
+        dialect = _csv.reader((), **self.csvkwargs).dialect
+        if dialect.quoting == _csv.QUOTE_NONE:
+            return None if dialect.escapechar else b''
+        if dialect.escapechar or not dialect.doublequote:
+            return None
+        quote = (dialect.quotechar or '').encode(self.encoding)
+        return quote if len(quote) == 1 else None
+    #-------------------------------------------------------------------
+    def _scan(self) -> None:
+        '''Builds the offset index and width statistics'''
+        stat = _os.stat(self.path)
+        self._stat = (stat.st_size, stat.st_mtime_ns)
+        self.header: list[str] = []
+        self.offsets = _array('Q', (0,))
+        self.widths: list[int] = []
+        self.n_rows = 0
+        if not stat.st_size: # Empty file cannot be memory-mapped
+            return
+        quote = self._quote()
+        with (open(self.path, 'rb') as file,
+              _mmap.mmap(file.fileno(), 0, access = _mmap.ACCESS_READ)
+              as data):
+            size = len(data)
+            start = 0
+            while start < size:
+                start = (size if quote is None else
+                         _csv_line_end(data, start,
+                                       min(start + self.chunk_size, size),
+                                       quote))
+                self.offsets.append(start)
+            bounds = list(zip(self.offsets, self.offsets[1:]))
+            skips = [self._skip] + [False] * (len(bounds) - 1)
+            if self.workers > 1 and len(bounds) > 1:
+                n = len(bounds)
+                with _ProcessPoolExecutor(min(self.workers, n)) as pool:
+                    stats = list(pool.map(_csv_stats_worker,
+                                          [str(self.path)] * n,
+                                          *zip(*bounds),
+                                          [self.encoding] * n,
+                                          [self.csvkwargs] * n,
+                                          skips))
+            else:
+                stats = [_csv_stats(data, start, end, self.encoding,
+                                    self.csvkwargs, skip)
+                         for (start, end), skip in zip(bounds, skips)]
+        self.header = stats[0][0]
+        for _, n_rows, widths in stats:
+            self.n_rows += n_rows
+            self.widths = [max(old, new) for old, new in
+                           _itertools.zip_longest(self.widths, widths,
+                                                  fillvalue = 0)]
+    #-------------------------------------------------------------------
+    def _check(self) -> None:
+        '''Scans the file again if it has changed'''
+        stat = _os.stat(self.path)
+        if (stat.st_size, stat.st_mtime_ns) != self._stat:
+            self._scan()
+    #-------------------------------------------------------------------
+    def _chunks(self) -> _Iterator[list[list[str]]]:
+        '''Rows parsed chunk by chunk'''
+        if len(self.offsets) < 2:
+            return
+        with (open(self.path, 'rb') as file,
+              _mmap.mmap(file.fileno(), 0, access = _mmap.ACCESS_READ)
+              as data):
+            for start, end in zip(self.offsets, self.offsets[1:]):
+                rows = _csv_parse(data, start, end,
+                                  self.encoding, self.csvkwargs)
+                if start == 0 and self._skip:
+                    del rows[0:1]
+                yield rows
+    #-------------------------------------------------------------------
+    def __len__(self) -> int:
+        return self.n_rows
+    #-------------------------------------------------------------------
+    def __iter__(self) -> _Iterator[list[str]]:
+        self._check()
+        return _itertools.chain.from_iterable(self._chunks())
+    #-------------------------------------------------------------------
+    def __eq__(self, other: _Any) -> bool:
+        return (isinstance(other, CSVRows)
+                and self.path == other.path
+                and self.encoding == other.encoding
+                and self._skip == other._skip
+                and self.csvkwargs == other.csvkwargs)
+    #-------------------------------------------------------------------
+    def __repr__(self) -> str:
+        return (f'{self.__class__.__name__}({str(self.path)!r}, '
+                f'{self._skip!r}, encoding = {self.encoding!r})')
+    #-------------------------------------------------------------------
+    def _cells(self) -> tuple[()]:
+        '''CSV cells are plain strings, never elements'''
+        return ()
+#-----------------------------------------------------------------------
+def _record_cells(records: list, key: _Any) -> list:
+    '''Cells of one column from records, missing cells empty'''
+    try:
+        return list(map(_itemgetter(key), records))
+    except (IndexError, KeyError): # Some records miss the cell
+        if isinstance(records[0], _Mapping):
+            return [record.get(key, '') for record in records]
+        return [record[key] if key < len(record) else ''
+                for record in records]
+#-----------------------------------------------------------------------
+def _fetch_batches(cursor: _Any, size: int) -> _Iterator[list]:
+    '''Batches of rows fetched from DB-API cursor'''
+    while batch := cursor.fetchmany(size):
+        yield batch
+#-----------------------------------------------------------------------
+def _encoded_or_array(codes: _Any, values: list) -> _Any:
+    '''EncodedColumn from NumPy codes where nulls are negative'''
+    values = list(map(str, values))
+    if (codes < 0).any():
+        codes = _np.where(codes < 0, len(values), codes)
+        values.append('')
+    return EncodedColumn(codes, values)
+#-----------------------------------------------------------------------
+def _series_column(series: _Any) -> _Any:
+    '''Column of pandas Series as NumPy array or EncodedColumn'''
+    if series.dtype.name == 'category':
+        return _encoded_or_array(series.cat.codes.to_numpy(),
+                                 list(series.cat.categories))
+    return series.to_numpy()
+#-----------------------------------------------------------------------
+def _arrow_column(column: _Any) -> _Any:
+    '''Column of Arrow array as NumPy array or EncodedColumn'''
+    if hasattr(column, 'unify_dictionaries'): # Chunked array
+        if hasattr(column.type, 'index_type'):
+            column = column.unify_dictionaries()
+        column = column.combine_chunks()
+    if hasattr(column.type, 'index_type'): # Dictionary encoded
+        return _encoded_or_array(column.indices.fill_null(-1).to_numpy(),
+                                 column.dictionary.to_pylist())
+    return column.to_numpy(zero_copy_only = False)
+#-----------------------------------------------------------------------
+_JSONL_CHUNK = 1 << 22 # Bytes of JSON Lines parsed at once by a worker
+#-----------------------------------------------------------------------
+def _jsonl_columns(lines: _Iterable[bytes], keys: list) -> list[list]:
+    '''Cells of the keys in the JSON lines as columns'''
+    records = [_json.loads(line) for line in lines if line.strip()]
+    return [_record_cells(records, key) for key in keys]
+#-----------------------------------------------------------------------
+def _jsonl_worker(path: str, start: int, end: int, keys: list
+                  ) -> list[list]:
+    '''_jsonl_columns of byte range of the file in a worker process'''
+    with (open(path, 'rb') as file,
+          _mmap.mmap(file.fileno(), 0, access = _mmap.ACCESS_READ) as data):
+        return _jsonl_columns(data[start:end].splitlines(), keys)
+#-----------------------------------------------------------------------
+def _jsonl_keys(path: _pathlib.Path | str) -> list:
+    '''Keys of the first record in JSON Lines file, indices for arrays'''
+    with open(path, 'rb') as file:
+        for line in file:
+            if line.strip():
+                record = _json.loads(line)
+                return list(record if isinstance(record, _Mapping) else
+                            range(len(record)))
+    return []
+#-----------------------------------------------------------------------
+def _jsonl_read(path: _pathlib.Path | str, keys: list,
+                limit: _Optional[int]) -> _Generator[list[list], None, None]:
+    '''Columns of the keys parsed chunk by chunk reading the lines'''
+    size = _ROW_CHUNK if limit is None else min(limit, _ROW_CHUNK)
+    with open(path, 'rb') as file:
+        while lines := list(_itertools.islice(file, size)):
+            yield _jsonl_columns(lines, keys)
+#-----------------------------------------------------------------------
+def _jsonl_pooled(path: _pathlib.Path | str, size: int, keys: list,
+                  workers: int, chunk_size: int
+                  ) -> _Generator[list[list], None, None]:
+    '''Columns of the keys parsed from byte ranges split on line breaks
+
+    Ranges are parsed in a pool with at most two ranges per worker
+    waiting at a time'''
+    bounds = []
+    with (open(path, 'rb') as file,
+          _mmap.mmap(file.fileno(), 0, access = _mmap.ACCESS_READ) as data):
+        start = 0
+        while start < size:
+            end = _csv_line_end(data, start, min(start + chunk_size, size),
+                                b'')
+            bounds.append((start, end))
+            start = end
+    pool = _executor(min(workers, len(bounds)))
+    try:
+        pending: _deque[_Future] = _deque()
+        for start, end in bounds:
+            pending.append(pool.submit(_jsonl_worker,
+                                       str(path), start, end, keys))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally: # Ranges after limit are not parsed
+        pool.shutdown(cancel_futures = True)
+#-----------------------------------------------------------------------
+def _jsonl_chunks(path: _pathlib.Path | str,
+                  keys: list,
+                  limit: _Optional[int] = None,
+                  workers: int = 1) -> _Iterator[list[list]]:
+    '''Columns of the keys in JSON Lines file chunk by chunk, with at
+    most limit rows. Missing cells are empty'''
+    if not keys or (limit is not None and limit < 1):
+        return
+    size = _os.stat(path).st_size
+    chunks = (_jsonl_pooled(path, size, keys, workers, _JSONL_CHUNK)
+              if workers > 1 and size > _JSONL_CHUNK else
+              _jsonl_read(path, keys, limit))
+    try:
+        for columns in chunks:
+            if limit is not None:
+                if len(columns[0]) >= limit:
+                    yield [column[:limit] for column in columns]
+                    return
+                limit -= len(columns[0])
+            yield columns
+    finally:
+        chunks.close()
+#-----------------------------------------------------------------------
+class _TableStore:
+    '''Escaped cells, column widths and padded lines of table rows kept
+    between renders, so that only appended rows are converted'''
+    __slots__ = ('content', 'cells', 'widths', 'key', 'lines')
+    def __init__(self) -> None:
+        self.content: list = []
+        self.cells: list[list[str]] = []
+        self.widths: list[int] = []
+        self.key: tuple = ()
+        self.lines: list[str] = [] # Padded for key
+    #-------------------------------------------------------------------
+    def update(self, content: list, formats: _Any = ()) -> None:
+        '''Converts rows added to content since last update'''
+        if content is not self.content or len(content) < len(self.cells):
+            self.__init__() # type: ignore
+            self.content = content
+        rows = [_escape_cells(_format_row(row, formats))
+                for row in content[len(self.cells):]]
+        columns = _transpose(rows)
+        widths = self.widths
+        widths.extend([0] * (len(columns) - len(widths)))
+        for index, column in enumerate(columns):
+            if (width := max(map(len, column))) > widths[index]:
+                widths[index] = width
+        self.cells.extend(rows)
+#=======================================================================
+@_dataclass(validate = True, **_maybeslots) # type: ignore
 class Table(IterableElement):
     '''Table of
 
@@ -592,38 +1667,234 @@ class Table(IterableElement):
     alignment_pad: Optional[Align], default None
         By default missing alignments are padded with the align of
         the last align in the iterable, but this can be overridden here.
+    schema: Optional[TableSchema], default None
+        Fixed column widths. With it the rows are rendered one by one
+        while iterating the content, which can then be an iterator.
+    workers: int, default 1
+        Number of processes padding and joining blocks of rows.
+        Threads on free-threaded Python. Not used with schema or
+        after appending rows.
+    formats: str | Iterable[str | None], default ()
+        Format specs of the cells, e.g. '.2f', ',' or '.1%'.
+        If just str, then all columns are formatted with it.
+        If iterable, then each item corresponds to one column and rest
+        are not formatted. Suffix 'S' scales the numbers to SI prefixes,
+        e.g. '.1S' gives 1.2k from 1234. Cells that are not numbers are
+        converted to str as they are and text numbers are parsed first.
+        Formatted columns are aligned RIGHT if align is empty and
+        align_pad is None.
     '''
     content: _Iterable[_Iterable]
     header: _Iterable
     align: Align | _Iterable[Align] = _field(default_factory = list)  # type: ignore
     compact: bool = False
     align_pad: Align | None = None
+    schema: TableSchema | None = None
+    workers: int = _field(default = 1, compare = False)
+    formats: str | _Iterable[_Optional[str]] = ()
+    _store: _Optional[_TableStore] = _field(
+        init = False, default = None, repr = False, compare = False)
+    _is_stored: _ClassVar[bool] = True
+    #-------------------------------------------------------------------
+    @property
+    def _is_cached(self) -> bool: # type: ignore
+        # Streamed content, e.g. an iterator, is not kept in memory
+        return (self.schema is None
+                and isinstance(self.content, _Collection)
+                and not isinstance(self.content, CSVRows))
+    #-------------------------------------------------------------------
+    def __setattr__(self, name: str, value: _Any) -> None:
+        super(Table, self).__setattr__(name, value)
+        if name[0] != '_': # Changed field makes cached render stale
+            self._changed = next(_render_stamps)
+            if name == 'formats' and getattr(self, '_store', None):
+                self._store = _TableStore() # Stored cells are formatted
+    #-------------------------------------------------------------------
+    def invalidate(self):
+        if self._store is not None: # Rows may have been modified in place
+            self._store = _TableStore()
+        return super(Table, self).invalidate()
+    #-------------------------------------------------------------------
+    def extend(self, rows: _Iterable[_Iterable]):
+        '''Appends rows to the table
+
+        The table then keeps converted cells, column widths and padded
+        lines between renders, so that rendering again converts only the
+        appended rows. Content that is not a list is converted to one.
+
+        Parameters
+        ----------
+        rows : Iterable[Iterable]
+            Rows to append
+        '''
+        if not isinstance(self.content, list):
+            self.content = list(self.content)
+        if self._store is None:
+            self._store = _TableStore()
+        self.content.extend(rows)
+        self._changed = next(_render_stamps)
+        return self
+    #-------------------------------------------------------------------
+    def encode(self, columns: _Optional[_Iterable[int]] = None):
+        '''Stores the content as Columns with columns dictionary encoded
+
+        Suits columns with few distinct values repeated in many rows.
+        Cells of the encoded columns are converted to str.
+
+        Parameters
+        ----------
+        columns : Iterable[int] | None, default None
+            Indices of the columns to encode. By default all columns
+        '''
+        if isinstance(self.content, Columns):
+            data = self.content.columns
+        else:
+            data = [list(column) for column
+                    in _itertools.zip_longest(*self.content, fillvalue = '')]
+        selected = range(len(data)) if columns is None else set(columns)
+        self.content = Columns([EncodedColumn.encode(column)
+                                if index in selected
+                                and not isinstance(column, EncodedColumn)
+                                else column
+                                for index, column in enumerate(data)])
+        self._store = None
+        return self
+    #-------------------------------------------------------------------
+    def pages(self,
+              rows: _Optional[int] = None,
+              size: _Optional[int] = None) -> _Iterator['Table']:
+        '''Splits the table into tables with the same header and
+        alignments, each having widths of its own
+
+        Content is iterated once and one page at a time is kept,
+        so pages of an iterator can be rendered as they are made.
+
+        Parameters
+        ----------
+        rows : int | None, default None
+            Maximum number of rows in a page
+        size : int | None, default None
+            Maximum number of characters in a rendered page. Page has at
+            least one row, even if it alone is longer
+
+        Yields
+        ------
+        Table
+            Page of the table. Table without rows gives one empty page
+        '''
+        if rows is None and size is None:
+            raise ValueError('Either rows or size must be given')
+        if (rows is not None and rows < 1) or (size is not None and size < 1):
+            raise ValueError('rows and size must be positive')
+        header = [len(str(cell)) for cell in self.header]
+        page: list = []
+        widths: list[int] = [] # Escaped cell widths of the page
+        n_chars = 0 # Escaped cell characters of the page
+        for row in self.content:
+            if size is not None:
+                lengths = [len(cell.translate(_table_translation))
+                           for cell in _format_row(row, self.formats)]
+                widths = [max(width, length) for width, length
+                          in _itertools.zip_longest(widths, lengths,
+                                                    fillvalue = 0)]
+                n_chars += sum(lengths)
+            if page and ((rows is not None and len(page) == rows)
+                         or (size is not None
+                             and _page_size(header, widths, len(page) + 1,
+                                            n_chars, self.compact) > size)):
+                yield self._page(page)
+                page = []
+                if size is not None:
+                    widths = lengths
+                    n_chars = sum(lengths)
+            page.append(row)
+        yield self._page(page) # Only page is empty if there are no rows
+    #-------------------------------------------------------------------
+    def _page(self, rows: list) -> 'Table':
+        return Table(rows, self.header, self.align, self.compact,
+                     self.align_pad, self.schema, self.workers, self.formats)
+    #-------------------------------------------------------------------
+    def to_files(self,
+                 path: _pathlib.Path | str,
+                 rows: _Optional[int] = None,
+                 size: _Optional[int] = None,
+                 compression: _Optional[str] = 'infer'
+                 ) -> list[_pathlib.Path]:
+        '''Writes pages of the table to separate files with links to the
+        previous and next pages
+
+        Pages are made like in pages and written one at a time like
+        with Document.to_file. Files are named by numbering the name of
+        the path, e.g. table.md gives table_1.md, table_2.md, ...
+
+        Parameters
+        ----------
+        path : pathlib.Path | str
+            Path from which page paths are made
+        rows : int | None, default None
+            Maximum number of rows in a page
+        size : int | None, default None
+            Maximum number of characters in a table of a page
+        compression : str | None, default 'infer'
+            'gzip', 'bz2', 'xz' or None. By default inferred from suffix
+
+        Returns
+        -------
+        list[pathlib.Path]
+            Paths of the pages
+        '''
+        path = _pathlib.Path(path)
+        stem, dot, suffix = path.name.partition('.')
+        names = lambda number: f'{stem}_{number}{dot}{suffix}'
+        paths = []
+        pages = self.pages(rows, size)
+        page: _Optional[Table] = next(pages)
+        number = 1
+        while page is not None:
+            following = next(pages, None)
+            navigation = Paragraph([f'Page {number}'], ' | ')
+            if number > 1:
+                navigation += Link(names(number - 1), 'Previous')
+            if following is not None:
+                navigation += Link(names(number + 1), 'Next')
+            paths.append(path.with_name(names(number)))
+            _write_file(Document([navigation, page, navigation]),
+                        paths[-1], compression)
+            page = following
+            number += 1
+        return paths
+    #-------------------------------------------------------------------
+    def append_rows(self, *rows: _Iterable):
+        '''Appends the rows to the table like extend'''
+        return self.extend(rows)
     #-------------------------------------------------------------------
     @classmethod
     def from_dict(cls,
                   data: dict[_Any, _Iterable],
                   align: Align | _Iterable[Align] | None = None,
                   compact: bool = False,
-                  align_pad: Align | None = None):
+                  align_pad: Align | None = None,
+                  formats: str | _Iterable[_Optional[str]] = ()):
         '''Assembles Table from dictionary
 
         Parameters
         ----------
-        data : dict[_Any, _Iterable]
-            _description_
+        data : dict[_Any, Sequence]
+            Header cells mapped to columns, e.g. lists or NumPy arrays
         align : Align | _Iterable[Align] | None, optional
             _description_, by default None
         compact : bool, optional
             _description_, by default False
         align_pad : _Optional[Align], optional
             _description_, by default None
+        formats : str | Iterable[str | None], default ()
+            Format specs of the columns, see Table
         '''
-        header = data.keys()
-        content = list(_itertools.zip_longest(*data.values(), fillvalue = ''))
         if align is None:
             align = []
 
-        return cls(content, header, align, compact, align_pad)
+        return cls(Columns(data.values()), list(data.keys()),
+                   align, compact, align_pad, formats = formats)
     #-------------------------------------------------------------------
     @classmethod
     def from_csv(cls,
@@ -634,6 +1905,9 @@ class Table(IterableElement):
                  align_pad: Align | None = None,
                  *,
                  encoding = 'utf8',
+                 stream: bool = False,
+                 workers: int = 1,
+                 formats: str | _Iterable[_Optional[str]] = (),
                  **csvkwargs: _Any):
         '''Assembles Table from pathlike to csv or file object
 
@@ -651,9 +1925,35 @@ class Table(IterableElement):
             _description_, by default None
         file : _type_, optional
             _description_, by default None
+        stream : bool, default False
+            Instead of reading the rows into memory, content is CSVRows
+            and the rows are read from the file while rendering.
+            Requires a path
+        workers : int, default 1
+            Number of processes parsing the file when streaming and
+            rendering the rows
+        formats : str | Iterable[str | None], default ()
+            Format specs of the columns, see Table. Numbers in the file
+            are parsed for formatting
         csvkwargs : _Optional[dict[str, _Any]], optional
             _description_, by default None
         '''
+        if stream:
+            if isinstance(path_or_file, _IOBase):
+                raise ValueError('Streaming CSV requires a path')
+            content = CSVRows(path_or_file, # type: ignore
+                              header is True,
+                              encoding = encoding,
+                              workers = workers,
+                              **csvkwargs)
+            return cls(content,
+                       content.header if header is True else
+                       ([] if header is False else header),
+                       [] if align is None else align,
+                       compact,
+                       align_pad,
+                       workers = workers,
+                       formats = formats)
 
         if isinstance(path_or_file, _IOBase):
             content = list(_csv.reader(path_or_file, **csvkwargs)) # type: ignore
@@ -670,63 +1970,563 @@ class Table(IterableElement):
         if align is None:
             align = []
 
-        return cls(content, header, align, compact, align_pad)
+        return cls(content, header, align, compact, align_pad,
+                   workers = workers, formats = formats)
     #-------------------------------------------------------------------
-    def _collect(self, visited: set[int]) -> tuple[set[int], _Collected]:
-        visited, collected = _collect_iter(self.header, visited,
-                                           _empty_collected())
-        for row in self.content:
-            visited, collected = _collect_iter(row, visited, collected)
-        return visited, collected
+    @classmethod
+    def from_csv_many(cls,
+                      paths: (_pathlib.Path | str
+                              | _Iterable[_pathlib.Path | str]),
+                      header: bool | _Iterable = True,
+                      align: Align | _Iterable[Align] | None = None,
+                      compact: bool = False,
+                      align_pad: Align | None = None,
+                      *,
+                      union: bool = True,
+                      source: _Optional[str] = None,
+                      encoding = 'utf8',
+                      workers: int = 1,
+                      formats: str | _Iterable[_Optional[str]] = (),
+                      **csvkwargs: _Any):
+        '''Assembles one Table or Table per file from many CSV files
+
+        Files are parsed in parallel into Columns.
+
+        Parameters
+        ----------
+        paths : Path | str | Iterable[Path | str]
+            Paths to the files. str with *, ? or [ is a glob pattern,
+            whose matches are sorted
+        header : bool | Iterable, default True
+            If True, first rows of the files are headers.
+            If Iterable, files have no headers and this is used
+        align : Align | Iterable[Align] | None, default None
+            Alignment of the columns, see Table
+        compact : bool, default False
+            Is the table compact or padded
+        align_pad : Align | None, default None
+            Alignment padding the align, see Table
+        union : bool, default True
+            If True, rows of all files are in one table in input order.
+            Columns are matched by header cells, so columns missing from
+            a file are empty. Without headers, columns are matched by
+            position. If False, list of tables, one per file
+        source : str | None, default None
+            If given, union has the path of the file as last column
+            with this as header
+        encoding : str, default 'utf8'
+            Encoding of the files
+        workers : int, default 1
+            Number of processes parsing the files and rendering the rows.
+            Threads on free-threaded Python
+        formats : str | Iterable[str | None], default ()
+            Format specs of the columns, see Table
+        csvkwargs
+            Passed to csv.reader
+
+        Returns
+        -------
+        Table | list[Table]
+            Union table or tables in the order of the paths
+        '''
+        paths = _csv_paths(paths)
+        n = len(paths)
+        arguments = (paths, [header is True] * n,
+                     [encoding] * n, [csvkwargs] * n)
+        if workers > 1 and n > 1:
+            with _executor(min(workers, n)) as pool:
+                parsed = list(pool.map(_csv_columns, *arguments))
+        else:
+            parsed = list(map(_csv_columns, *arguments))
+        if align is None:
+            align = []
+
+        if not union:
+            return [cls(Columns(columns),
+                        head if header is True else
+                        ([] if header is False else header),
+                        align, compact, align_pad,
+                        workers = workers, formats = formats)
+                    for head, _, columns in parsed]
+
+        indices: dict[tuple, int] = {} # Header cell and occurrence
+        data: list[list[str]] = []
+        n_total = 0
+        for head, n_rows, columns in parsed:
+            occurrences: dict[str, int] = _defaultdict(int)
+            keys: list[tuple] = []
+            for cell in head:
+                keys.append((cell, occurrences[cell]))
+                occurrences[cell] += 1
+            keys.extend((None, index) for index # Matched by position
+                        in range(len(head), len(columns)))
+            for key, column in _itertools.zip_longest(keys, columns,
+                                                      fillvalue = ()):
+                if (index := indices.get(key)) is None:
+                    index = indices[key] = len(data)
+                    data.append([''] * n_total)
+                data[index].extend(column)
+            n_total += n_rows
+            for column in data:
+                column.extend([''] * (n_total - len(column)))
+        if header is True:
+            header = ['' if cell is None else cell for cell, _ in indices]
+        elif header is False:
+            header = []
+        if source is not None:
+            header = list(header)
+            header.extend([''] * (len(data) - len(header)))
+            header.append(source)
+            data.append(EncodedColumn( # type: ignore
+                _itertools.chain.from_iterable(
+                    _itertools.repeat(index, n_rows)
+                    for index, (_, n_rows, _) in enumerate(parsed)),
+                [str(path) for path in paths]))
+        return cls(Columns(data), header, align, compact, align_pad,
+                   workers = workers, formats = formats)
     #-------------------------------------------------------------------
-    def __str__(self) -> str:
-        header = [str(cell) for cell in self.header]
-        headerlen = len(header)
+    @classmethod
+    def from_jsonl(cls,
+                   path: _pathlib.Path | str,
+                   keys: _Optional[_Iterable] = None,
+                   limit: _Optional[int] = None,
+                   align: Align | _Iterable[Align] | None = None,
+                   compact: bool = False,
+                   align_pad: Align | None = None,
+                   *,
+                   stream: bool = False,
+                   workers: int = 1,
+                   formats: str | _Iterable[_Optional[str]] = ()):
+        '''Assembles Table from JSON Lines file, one row per record
+
+        Lines are parsed in chunks into Columns, so records are not kept.
 
-        # Conversion to str and escaping |
-        content = [[str(cell).translate(_table_translation) for cell in row]
-                   for row in self.content]
+        Parameters
+        ----------
+        path : Path | str
+            Path to the JSON Lines file. Blank lines are skipped
+        keys : Iterable | None, default None
+            Keys of the cells to select in order, indices for arrays.
+            They are the header. By default those of the first record
+        limit : int | None, default None
+            Maximum number of rows read from the start of the file
+        align : Align | Iterable[Align] | None, default None
+            Alignment of the columns, see Table
+        compact : bool, default False
+            Is the table compact or padded
+        align_pad : Align | None, default None
+            Alignment padding the align, see Table
+        stream : bool, default False
+            Instead of reading the rows into memory, content is an
+            iterator reading the file while rendering. Table can then
+            be rendered only once
+        workers : int, default 1
+            Number of processes parsing parts of the file in parallel
+            and rendering the rows
+        formats : str | Iterable[str | None], default ()
+            Format specs of the columns, see Table
+        '''
+        keys = _jsonl_keys(path) if keys is None else list(keys)
+        chunks = _jsonl_chunks(path, keys, limit, workers)
+        if stream:
+            content: _Any = _itertools.chain.from_iterable(
+                zip(*columns) for columns in chunks)
+        else:
+            data: list[list] = [[] for _ in keys]
+            for columns in chunks:
+                for column, cells in zip(data, columns):
+                    column.extend(cells)
+            content = Columns(data)
+        return cls(content, keys, [] if align is None else align,
+                   compact, align_pad, workers = workers, formats = formats)
+    #-------------------------------------------------------------------
+    @classmethod
+    def from_records(cls,
+                     records: _Iterable[_Mapping | _Sequence],
+                     columns: _Optional[_Iterable] = None,
+                     header: _Optional[_Iterable] = None,
+                     align: Align | _Iterable[Align] | None = None,
+                     compact: bool = False,
+                     align_pad: Align | None = None,
+                     *,
+                     workers: int = 1,
+                     formats: str | _Iterable[_Optional[str]] = ()):
+        '''Assembles Table from records, e.g. dicts or tuples
+
+        Records are read in chunks into Columns, so rows are not kept.
 
-        max_rowlen = headerlen
-        for row in content:
-            if len(row) > max_rowlen:
-                max_rowlen = len(row)
-        # Pad header with empty cells
-        header.extend(['']*(max_rowlen - len(header)))
+        Parameters
+        ----------
+        records : Iterable[Mapping | Sequence]
+            Records of the rows. Missing cells are empty
+        columns : Iterable | None, default None
+            Keys or indices of the cells to select in order.
+            By default those of the first record
+        header : Iterable | None, default None
+            Header of the table. By default the keys of mapping records
+        align : Align | Iterable[Align] | None, default None
+            Alignment of the columns, see Table
+        compact : bool, default False
+            Is the table compact or padded
+        align_pad : Align | None, default None
+            Alignment padding the align, see Table
+        workers : int, default 1
+            Number of workers rendering the rows, see Table
+        formats : str | Iterable[str | None], default ()
+            Format specs of the columns, see Table
+        '''
+        records = iter(records)
+        chunk = list(_itertools.islice(records, _ROW_CHUNK))
+        if columns is not None:
+            keys = list(columns)
+        elif not chunk:
+            keys = []
+        elif isinstance(chunk[0], _Mapping):
+            keys = list(chunk[0])
+        else:
+            keys = list(range(len(chunk[0])))
+        if header is None:
+            header = (keys if chunk and isinstance(chunk[0], _Mapping) else
+                      [])
+        data: list[list] = [[] for _ in keys]
+        while chunk:
+            for column, key in zip(data, keys):
+                column.extend(_record_cells(chunk, key))
+            chunk = list(_itertools.islice(records, _ROW_CHUNK))
+        return cls(Columns(data), header, [] if align is None else align,
+                   compact, align_pad, workers = workers, formats = formats)
+    #-------------------------------------------------------------------
+    @classmethod
+    def from_cursor(cls,
+                    cursor: _Any,
+                    header: bool | _Iterable = True,
+                    align: Align | _Iterable[Align] | None = None,
+                    compact: bool = False,
+                    align_pad: Align | None = None,
+                    *,
+                    batch_size: int = _ROW_CHUNK,
+                    stream: bool = False,
+                    workers: int = 1,
+                    formats: str | _Iterable[_Optional[str]] = ()):
+        '''Assembles Table from rows of executed DB-API cursor,
+        e.g. sqlite3.Cursor
+
+        Rows are fetched in batches with fetchmany and read into Columns.
 
-        # Pad rows to with empty cells
-        for row in content:
-            row.extend([''] * (max_rowlen - len(row)))
+        Parameters
+        ----------
+        cursor : Any
+            Cursor with the query executed
+        header : bool | Iterable, default True
+            If True, column names from cursor description.
+            If False, no header
+        align : Align | Iterable[Align] | None, default None
+            Alignment of the columns, see Table
+        compact : bool, default False
+            Is the table compact or padded
+        align_pad : Align | None, default None
+            Alignment padding the align, see Table
+        batch_size : int, default 4096
+            Number of rows fetched at a time
+        stream : bool, default False
+            Instead of reading the rows into memory, content is an
+            iterator fetching the rows while rendering. Table can then
+            be rendered only once
+        workers : int, default 1
+            Number of workers rendering the rows, see Table
+        formats : str | Iterable[str | None], default ()
+            Format specs of the columns, see Table
+        '''
+        description = cursor.description or ()
+        if header is True:
+            header = [column[0] for column in description]
+        elif header is False:
+            header = []
+        batches = _fetch_batches(cursor, batch_size)
+        if stream:
+            content: _Any = _itertools.chain.from_iterable(batches)
+        else:
+            data: list[list] = [[] for _ in description]
+            for batch in batches:
+                data.extend([] for _ in range(len(batch[0]) - len(data)))
+                for column, cells in zip(data, zip(*batch)):
+                    column.extend(cells)
+            content = Columns(data)
+        return cls(content, header, [] if align is None else align,
+                   compact, align_pad, workers = workers, formats = formats)
+    #-------------------------------------------------------------------
+    @classmethod
+    def from_dataframe(cls,
+                       frame: _Any,
+                       index: bool = False,
+                       align: Align | _Iterable[Align] | None = None,
+                       compact: bool = False,
+                       align_pad: Align | None = None,
+                       *,
+                       workers: int = 1,
+                       formats: str | _Iterable[_Optional[str]] = ()):
+        '''Assembles Table from pandas DataFrame
+
+        Columns are read as NumPy arrays and categoricals as
+        EncodedColumn, without making rows.
 
-        # Pad align with Align
+        Parameters
+        ----------
+        frame : pandas.DataFrame
+            Data frame of the table. Column labels are the header
+        index : bool, default False
+            Is the index included as the first column
+        align : Align | Iterable[Align] | None, default None
+            Alignment of the columns, see Table
+        compact : bool, default False
+            Is the table compact or padded
+        align_pad : Align | None, default None
+            Alignment padding the align, see Table
+        workers : int, default 1
+            Number of workers rendering the rows, see Table
+        formats : str | Iterable[str | None], default ()
+            Format specs of the columns, see Table
+        '''
+        header = list(frame.columns)
+        data = [_series_column(series) for _, series in frame.items()]
+        if index:
+            header.insert(0, '' if frame.index.name is None
+                          else frame.index.name)
+            data.insert(0, _series_column(frame.index.to_series()))
+        return cls(Columns(data), header, [] if align is None else align,
+                   compact, align_pad, workers = workers, formats = formats)
+    #-------------------------------------------------------------------
+    @classmethod
+    def from_arrow(cls,
+                   table: _Any,
+                   align: Align | _Iterable[Align] | None = None,
+                   compact: bool = False,
+                   align_pad: Align | None = None,
+                   *,
+                   workers: int = 1,
+                   formats: str | _Iterable[_Optional[str]] = ()):
+        '''Assembles Table from Arrow table or record batch
+
+        Columns are read as NumPy arrays and dictionary arrays as
+        EncodedColumn, without making rows.
+
+        Parameters
+        ----------
+        table : pyarrow.Table | pyarrow.RecordBatch
+            Arrow data of the table. Column names are the header
+        align : Align | Iterable[Align] | None, default None
+            Alignment of the columns, see Table
+        compact : bool, default False
+            Is the table compact or padded
+        align_pad : Align | None, default None
+            Alignment padding the align, see Table
+        workers : int, default 1
+            Number of workers rendering the rows, see Table
+        formats : str | Iterable[str | None], default ()
+            Format specs of the columns, see Table
+        '''
+        return cls(Columns(list(map(_arrow_column, table.columns))),
+                   list(table.column_names),
+                   [] if align is None else align,
+                   compact, align_pad, workers = workers, formats = formats)
+    #-------------------------------------------------------------------
+    def _children(self) -> _Iterable[_Any]:
+        content = self.content
+        if isinstance(content, _Iterator): # Rows can be iterated only once
+            return iter(self.header)
+        return _itertools.chain(self.header,
+                                content._cells()
+                                if isinstance(content, (Columns, CSVRows)) else
+                                _itertools.chain.from_iterable(content))
+    #-------------------------------------------------------------------
+    def _aligns(self, n_columns: int) -> list[Align]:
+        '''Alignments padded to the number of columns'''
+        # Numbers formatted by spec are aligned by the right
         if isinstance(self.align, Align):
-            aligns = [self.align] * max_rowlen
+            return [self.align] * n_columns
+        aligns = list(self.align)
+        if not aligns and self.align_pad is None and self.formats:
+            return [LEFT if spec is None else RIGHT
+                    for spec in self._specs(n_columns)]
+        aligns.extend([(aligns[-1] if aligns else LEFT)
+                       if self.align_pad is None else self.align_pad
+                       ] * (n_columns - len(aligns)))
+        return aligns
+    #-------------------------------------------------------------------
+    def _specs(self, n_columns: int) -> list[_Optional[str]]:
+        '''Format specs padded to the number of columns'''
+        if isinstance(self.formats, str):
+            return [self.formats] * n_columns
+        specs = list(self.formats)[:n_columns]
+        return specs + [None] * (n_columns - len(specs))
+    #-------------------------------------------------------------------
+    def _render_columns(self, writer: _Writer) -> None:
+        '''Renders Columns content column by column'''
+        header = [str(cell) for cell in self.header]
+        data = self.content.columns # type: ignore
+        columns = [_column_strings(column, spec) for column, spec
+                   in zip(data, self._specs(len(data)))]
+        n_columns = max(len(header), len(columns))
+        header.extend([''] * (n_columns - len(header)))
+        columns.extend([[]] * (n_columns - len(columns)))
+        aligns = self._aligns(n_columns)
+        widths = (None if self.compact else
+                  [max(len(cell), max(map(len, column.values
+                                          if isinstance(column, EncodedColumn)
+                                          else column), default = 0), 3)
+                   for cell, column in zip(header, columns)])
+        writer.write(_table_head(header, widths, aligns))
+        _write_blocks(writer,
+                      _row_blocks(columns, max(map(len, columns), default = 0)),
+                      widths, aligns, self.workers)
+    #-------------------------------------------------------------------
+    def _render_csv(self, writer: _Writer) -> None:
+        '''Renders CSVRows content chunk by chunk using width statistics
+        from ingest'''
+        content: CSVRows = self.content # type: ignore
+        content._check()
+        header = [str(cell) for cell in self.header]
+        n_columns = max(len(header), len(content.widths))
+        header.extend([''] * (n_columns - len(header)))
+        aligns = self._aligns(n_columns)
+        widths = (None if self.compact
+                  else _column_widths(header, content.widths))
+        writer.write(_table_head(header, widths, aligns))
+        _write_blocks(writer,
+                      ((len(rows), list(map(_escape_cells, _transpose(rows))))
+                       for rows in content._chunks()),
+                      widths, aligns, self.workers)
+    #-------------------------------------------------------------------
+    def _render_rows(self, writer: _Writer) -> None:
+        '''Renders rows in two passes
+
+        First pass escapes the cells and measures the columns chunk by
+        chunk. Many rows from content that is not a collection are
+        spilled to a temporary file, which the second pass reads back.'''
+        header = [str(cell) for cell in self.header]
+        is_spillable = not isinstance(self.content, _Collection)
+        widths: list[int] = []
+        chunks: list[tuple[int, list[list[str]]]] = [] # Rows and columns
+        n_buffered = 0
+        with _ExitStack() as stack:
+            spill = None
+            rows = iter(self.content)
+            while chunk := list(_itertools.islice(rows, _ROW_CHUNK)):
+                columns = _transpose([list(row) for row in chunk])
+                columns = [_escape_cells(_format_cells(column, spec))
+                           for column, spec
+                           in zip(columns, self._specs(len(columns)))]
+                widths.extend([0] * (len(columns) - len(widths)))
+                for index, column in enumerate(columns):
+                    if (width := max(map(len, column))) > widths[index]:
+                        widths[index] = width
+                if spill is not None:
+                    _spill_rows(spill, len(chunk), columns)
+                    continue
+                chunks.append((len(chunk), columns))
+                n_buffered += len(chunk)
+                if is_spillable and n_buffered > _SPILL_ROWS:
+                    spill = stack.enter_context(_spill())
+                    for n_rows, columns in chunks:
+                        _spill_rows(spill, n_rows, columns)
+                    chunks.clear()
+
+            n_columns = max(len(header), len(widths))
+            header.extend([''] * (n_columns - len(header)))
+            aligns = self._aligns(n_columns)
+            widths = (None if self.compact # type: ignore
+                      else _column_widths(header, widths))
+            writer.write(_table_head(header, widths, aligns))
+            _write_blocks(writer,
+                          chunks if spill is None else _unspill_rows(spill),
+                          widths, aligns, self.workers)
+    #-------------------------------------------------------------------
+    def _render_store(self, writer: _Writer) -> None:
+        '''Renders rows reusing lines padded in earlier renders if the
+        widths and alignments are the same'''
+        store: _TableStore = self._store # type: ignore
+        store.update(self.content, self.formats) # type: ignore
+        header = [str(cell) for cell in self.header]
+        n_columns = max(len(header), len(store.widths))
+        header.extend([''] * (n_columns - len(header)))
+        aligns = self._aligns(n_columns)
+        if self.compact:
+            widths = None
+            key: tuple = (n_columns,)
+        else:
+            widths = _column_widths(header, store.widths)
+            key = (*widths, *aligns)
+        if key != store.key:
+            store.key = key
+            store.lines = []
+        lines = store.lines
+        if len(lines) < len(store.cells):
+            empty = [''] * n_columns
+            if widths is None:
+                lines.extend('|'.join(cells + empty[len(cells):])
+                             for cells in store.cells[len(lines):])
+            else:
+                line_format = _line_format(widths, aligns)
+                lines.extend(line_format.format(*cells, *empty[len(cells):])
+                             for cells in store.cells[len(lines):])
+        writer.write(_table_head(header, widths, aligns))
+        if lines:
+            writer.write('\n')
+            writer.write('\n'.join(lines))
+    #-------------------------------------------------------------------
+    def _render_schema(self, writer: _Writer) -> None:
+        '''Renders rows one by one using widths from the schema'''
+        schema: TableSchema = self.schema # type: ignore
+        widths = list(schema.widths)
+        n_columns = len(widths)
+        header = [str(cell) for cell in self.header]
+        if len(header) > n_columns:
+            raise ValueError(f'Header has {len(header)} cells, '
+                             f'but schema has {n_columns} columns')
+        header.extend([''] * (n_columns - len(header)))
+        aligns = self._aligns(n_columns)
+        if self.compact:
+            writer.write(_table_head(header, None, aligns))
         else:
-            aligns = list(self.align)
-
-            aligns.extend([(aligns[-1] if aligns else LEFT)
-                          if self.align_pad is None else self.align_pad
-                          ] * (max_rowlen - len(aligns)))
-
-        # Build the table
-        if self.compact: # Compact table
-            output = [header, (alignment.value[0](3) for alignment in aligns)]
-            output.extend(content)
-            return '\n'.join('|'.join(row) for row in output)
-        else: # Pretty table
-            # maximum cell widths
-            max_widths = ([max(len(cell), 3) for cell in header]
-                          + (max_rowlen - headerlen) * [3])
-            for row in content:
-                for i, cell in enumerate(row):
-                    if len(cell) > max_widths[i]:
-                        max_widths[i] = len(cell)
-
-            output = [_pad(header, max_widths, aligns),
-                      (align.value[0](width) for align, width
-                       in zip(aligns, max_widths))]
-            output.extend(_pad(row, max_widths, aligns) for row in content)
-            return '\n'.join('| ' + ' | '.join(row) + ' |' for row in output)
+            widths = [max(width, len(cell), 3)
+                      for width, cell in zip(widths, header)]
+            writer.write(_table_head(header, widths, aligns))
+        overflow = schema.overflow.value[0]
+        line_format = _line_format(widths, aligns)
+        write = writer.write
+        formats = self.formats
+        for row in self.content:
+            cells = _format_row(row, formats)
+            if len(cells) > n_columns:
+                raise ValueError(f'Row has {len(cells)} cells, '
+                                 f'but schema has {n_columns} columns')
+            cells.extend([''] * (n_columns - len(cells)))
+            escaped = _escape_cells(cells)
+            if self.compact:
+                write('\n' + '|'.join(escaped))
+            elif (overflow is _expand
+                  or not any(map(_gt, map(len, escaped), widths))):
+                write('\n' + line_format.format(*escaped))
+            else:
+                lines = [overflow(cell, width)
+                         for cell, width in zip(cells, widths)]
+                for line in _itertools.zip_longest(*lines, fillvalue = ''):
+                    write('\n' + line_format.format(*line))
+    #-------------------------------------------------------------------
+    def render_into(self, writer: _Writer) -> None:
+        if self.schema is not None:
+            self._render_schema(writer)
+            return
+        if isinstance(self.content, Columns):
+            self._render_columns(writer)
+            return
+        if isinstance(self.content, CSVRows) and not self.formats:
+            self._render_csv(writer) # Widths from ingest are unformatted
+            return
+        if self._store is not None and isinstance(self.content, list):
+            self._render_store(writer)
+            return
+        self._render_rows(writer)
 #=======================================================================
 class TextStyle(_Enum):
     '''Text styling options'''
@@ -746,7 +2546,7 @@ class TextLevel(_Enum):
 
 SUBSCRIPT, NORMAL, SUPERSCRIPT = TextLevel
 #-----------------------------------------------------------------------
-@_dataclass(validate = _IS_VALIDATION, **_maybeslots) # type: ignore
+@_dataclass(validate = True, **_maybeslots) # type: ignore
 class Text(ContainerElement, InlineElement):
     '''Stylised text
 
@@ -764,106 +2564,112 @@ class Text(ContainerElement, InlineElement):
     style: set[TextStyle] = _field(default_factory = set)
     level: TextLevel = NORMAL
     colour: _Any = None
+    _is_cached: _ClassVar[bool] = False
     #-------------------------------------------------------------------
-    def __str__(self) -> str:
+    def render_into(self, writer: _Writer) -> None:
         # superscipt and subcript have to be the innermost
         marker = self.level.value
-        text = f'{marker}{self.content}{marker}'
-
+        lefts = [marker]
+        rights = [marker]
         if self.colour is not None:
-            text = f'<font color="{self.colour}">{text}</font>'
+            lefts.append(f'<font color="{self.colour}">')
+            rights.append('</font>')
 
         for substyle in self.style:
             left, right = substyle.value
-            text = f'{left}{text}{right}'
-        return text
+            lefts.append(left)
+            rights.append(right)
+        writer.write(''.join(reversed(lefts)))
+        _render(self.content, writer)
+        writer.write(''.join(rights))
     #-------------------------------------------------------------------
     def bold(self):
         '''Makes bolded'''
         self.style.add(BOLD)
-        return self
+        return self.invalidate()
     #-------------------------------------------------------------------
     def unbold(self):
         '''Removes bolding'''
         self.style.discard(BOLD)
-        return self
+        return self.invalidate()
     #-------------------------------------------------------------------
     def italicize(self):
         '''Makes italics'''
         self.style.add(ITALIC)
-        return self
+        return self.invalidate()
     #-------------------------------------------------------------------
     def unitalicize(self):
         '''Removes italics'''
         self.style.discard(ITALIC)
-        return self
+        return self.invalidate()
     #-------------------------------------------------------------------
     def strikethrough(self):
         '''Adds strikethrough'''
         self.style.add(STRIKETHROUGH)
-        return self
+        return self.invalidate()
     #-------------------------------------------------------------------
     def unstrikethrough(self):
         '''Removes strikethrough'''
         self.style.discard(STRIKETHROUGH)
-        return self
+        return self.invalidate()
     #-------------------------------------------------------------------
     def highlight(self):
         '''Adds highlighting'''
         self.style.add(HIGHLIGHT)
-        return self
+        return self.invalidate()
     #-------------------------------------------------------------------
     def unhighlight(self):
         '''Removes highlighting'''
         self.style.discard(HIGHLIGHT)
-        return self
+        return self.invalidate()
     #-------------------------------------------------------------------
     def underline(self):
         '''Adds underlining'''
         self.style.add(UNDERLINE)
-        return self
+        return self.invalidate()
     #-------------------------------------------------------------------
     def ununderline(self):
         '''Removes underlining'''
         self.style.discard(UNDERLINE)
-        return self
+        return self.invalidate()
     #-------------------------------------------------------------------
     def superscribe(self):
         '''Makes text superscript'''
         self.level = SUPERSCRIPT
-        return self
+        return self.invalidate()
     #-------------------------------------------------------------------
     def subscribe(self):
         '''Makes text subscript'''
         self.level = SUBSCRIPT
-        return self
+        return self.invalidate()
     #-------------------------------------------------------------------
     def normalise(self):
         '''Removes superscript or subscript'''
         self.level = NORMAL
-        return self
+        return self.invalidate()
     #-------------------------------------------------------------------
     def destyle(self):
         '''Removes all styling, but not level'''
         self.style = set()
-        return self
+        return self.invalidate()
     #-------------------------------------------------------------------
     def reset(self):
         '''Removes all formatting'''
         self.style = set()
         self.level = NORMAL
-        return self
+        return self.invalidate()
 #=======================================================================
-@_dataclass(validate = _IS_VALIDATION, **_maybeslots) # type: ignore
+@_dataclass(validate = True, **_maybeslots) # type: ignore
 class TOC(Element):
     '''Marker where table of contents will be placed.
     Also during conversion to text the text for table of contents
     is stored here.'''
     level: int = 4
-    _text: str = _field(init = False, default = '')
+    # Set when rendered, so not part of the content
+    _text: str = _field(init = False, default = '', compare = False)
     #-------------------------------------------------------------------
-    def __str__(self) -> str:
-        return self._text
+    def render_into(self, writer: _Writer) -> None:
+        writer.write(self._text)
 #=======================================================================
 # Document
 def _flatten(content: _Iterable[_Any]) -> _Generator[_Any, None, None]:
@@ -874,66 +2680,509 @@ def _flatten(content: _Iterable[_Any]) -> _Generator[_Any, None, None]:
         else:
             yield item
 #=======================================================================
-def _preprocess_document(content: _Iterable[_Any]
-                         ) -> tuple[list[_Any],
-                                    dict[int, list[TOC]],
-                                    int,
-                                    list[Heading],
-                                    dict[tuple[str, str], list[Link]],
-                                    dict[str, list[Footnote]]]:
-    '''Iterates through document tree and collects
-        - TOCs
-        - headers
-        - references
-        - footnotes
-    and sanitises string objects'''
-    new_content: list[str] = []
-    TOCs: dict[int, list[TOC]] = _defaultdict(list)
-    top_level = 0
-    headings: list[Heading] = []
-    collected: _Collected = (_ListDict(), _ListDict())
-    visited: set[int] = set()
+# RENDER CACHE
+_plain_types = frozenset((str, int, float, bool, type(None)))
+_sequence_types = frozenset((list, tuple))
+#-----------------------------------------------------------------------
+def _digest_value(value: _Any, memo: dict[int, str]) -> str:
+    '''Stable text representation of a field value for digest'''
+    if type(value) in _plain_types:
+        return repr(value)
+    if isinstance(value, Element):
+        return _digest(value, memo)
+    if _is_array(value) and value.dtype.kind != 'O':
+        return (f'ndarray({value.dtype.str},{value.shape},' # Whole data
+                f'{_blake2b(_np.ascontiguousarray(value).tobytes()).hexdigest()})')
+    if isinstance(value, Columns):
+        return f'Columns({_digest_value(value.columns, memo)})'
+    if isinstance(value, EncodedColumn):
+        return (f'EncodedColumn({value.codes.typecode},'
+                f'{_blake2b(value.codes.tobytes()).hexdigest()},'
+                f'{_digest_value(value.values, memo)})')
+    if isinstance(value, CSVRows): # File identified by path and stat
+        value._check()
+        return (f'{value!r}({value._stat},'
+                f'{_digest_value(value.csvkwargs, memo)})')
+    if _is_array(value) or isinstance(value, (list, tuple)):
+        return f'[{",".join(_digest_value(item, memo) for item in value)}]'
+    if isinstance(value, (set, frozenset)): # Set order varies between runs
+        return ('{' + ','.join(sorted(_digest_value(item, memo)
+                                     for item in value)) + '}')
+    if isinstance(value, dict):
+        return ('{' + ','.join(f'{_digest_value(key, memo)}:'
+                               f'{_digest_value(item, memo)}'
+                               for key, item in value.items()) + '}')
+    if isinstance(value, _Enum):
+        return f'{type(value).__qualname__}.{value.name}'
+    # Dataclasses, e.g. TableSchema
+    if (names := _digest_fields(type(value))) is not None: # type: ignore
+        return (f'{type(value).__qualname__}('
+                + ','.join(_digest_value(getattr(value, name), memo)
+                           for name in names) + ')')
+    # Other objects are rendered with str, so that is their content
+    if isinstance(value, _Iterator) or _address.search(text := str(value)):
+        raise _Unstable(value) # Consumed or differs between processes
+    return f'{type(value).__qualname__}({text!r})'
+#-----------------------------------------------------------------------
+_address = _re.compile(' at 0x[0-9a-fA-F]+') # In default object repr
+#-----------------------------------------------------------------------
+class _Unstable(Exception):
+    '''Value has no digest that is the same across processes'''
+#-----------------------------------------------------------------------
+@_cache
+def _digest_fields(cls: type) -> _Optional[tuple[str, ...]]:
+    '''Names of the fields that make the digest'''
+    if '__dataclass_fields__' not in vars(cls):
+        return None
+    return tuple(field.name for field in _fields(cls) if field.compare)
+#-----------------------------------------------------------------------
+def _digest(element: Element, memo: dict[int, str]) -> str:
+    '''Digest of the element from class and compared fields'''
+    if (digest := memo.get(id(element))) is not None:
+        if not digest: # Found unstable before
+            raise _Unstable(element)
+        return digest
+    cls = type(element)
+    parts = [cls.__module__, cls.__qualname__]
+    try:
+        if (names := _digest_fields(cls)) is None: # type: ignore
+            # Subclass not being dataclass may have any attributes
+            parts.append(repr(str(element)))
+        else:
+            parts.extend(f'{name}={_digest_value(getattr(element, name), memo)}'
+                         for name in names)
+    except _Unstable:
+        memo[id(element)] = ''
+        raise
+    digest = _blake2b('\n'.join(parts).encode(), digest_size = 20).hexdigest()
+    memo[id(element)] = digest
+    return digest
+#-----------------------------------------------------------------------
+def _stable_digest(element: Element, memo: dict[int, str]) -> _Optional[str]:
+    '''Digest of the element or None if it is not stable'''
+    try:
+        return _digest(element, memo)
+    except _Unstable:
+        return None
+#-----------------------------------------------------------------------
+class RenderCache:
+    '''Persistent cache of rendered element text in an sqlite file
 
-    for item in _flatten(content):
+    Maps element digests to the rendered markdown. Used for elements
+    that are slow to render compared to making the digest, i.e. tables.
+    Elements whose text depends on the document, i.e. contain footnotes
+    or link references, and elements without stable digest, e.g. tables of
+    iterators, are not stored. When stored text exceeds max_size,
+    least recently used entries are removed.
+    The file can be shared by several processes.
 
-        if isinstance(item, str):
-            new_content.append(_sanitise(item).strip())
-        else:
-            new_content.append(item)
-            if isinstance(item, Section):
-                item.level = 1
-            if isinstance(item, TOC):
-                TOCs[item.level].append(item)
-            else:
-                visited, collected = _collect(item, visited, collected)
-                if isinstance(item, Heading) and item.in_TOC:
-                    headings.append(item)
-                    if item.level < top_level or not top_level:
-                        top_level = item.level
-    return new_content, TOCs, top_level, headings, *collected
-#=======================================================================
-def _process_footnotes(footnotes: dict[str, list[Footnote]]) -> str:
-    '''Makes footone list text from collected footnotes and updates
-    their indices'''
-    info = []
-    for index, footnote_list in enumerate(footnotes.values(), start = 1):
-        # Adding same index to all footnotes with same text
-        for footnote in footnote_list:
-            footnote._index = index
-        info.append((index, footnote.content)) # Same content in previous loop
-    return '\n'.join(f'[^{index}]: {content}' for index, content in info)
+    Parameters
+    ----------
+    path: pathlib.Path | str
+        Path of the sqlite file. Created if missing
+    max_size: int, default 2**28
+        Maximum number of characters of stored text
+
+    Attributes
+    ----------
+    hits: int
+        Number of renders found from the cache
+    misses: int
+        Number of renders not found from the cache
+    '''
+    #-------------------------------------------------------------------
+    def __init__(self, path: _pathlib.Path | str, max_size: int = 1 << 28):
+        if max_size < 0:
+            raise ValueError(f'max_size must be non-negative, not {max_size}')
+        self.path = _pathlib.Path(path)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._used: dict[str, int] = {} # Use times written on flush
+        self._connection = _sqlite3.connect(self.path, timeout = 30)
+        # Readers do not block writer in other processes and vice versa
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        self._connection.execute('''CREATE TABLE IF NOT EXISTS renders (
+                                    digest TEXT PRIMARY KEY,
+                                    text TEXT NOT NULL,
+                                    size INTEGER NOT NULL,
+                                    used INTEGER NOT NULL)''')
+        self._connection.execute('''CREATE INDEX IF NOT EXISTS renders_used
+                                    ON renders (used)''')
+        self._connection.commit()
+        self._size = self._connection.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM renders').fetchone()[0]
+    #-------------------------------------------------------------------
+    def get(self, digest: str) -> _Optional[str]:
+        '''Cached text for the digest or None'''
+        row = self._connection.execute(
+            'SELECT text FROM renders WHERE digest = ?', (digest,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        # Not updated here, as that would keep the file locked for writing
+        self._used[digest] = _time.time_ns()
+        return row[0]
+    #-------------------------------------------------------------------
+    def put(self, digest: str, text: str) -> None:
+        '''Stores text for the digest, evicting old entries if needed'''
+        if len(text) > self.max_size:
+            return
+        with self._connection: # Committed right away
+            self._connection.execute('''INSERT OR REPLACE INTO renders
+                                        VALUES (?, ?, ?, ?)''',
+                                     (digest, text, len(text),
+                                      _time.time_ns()))
+            self._size += len(text)
+            if self._size > self.max_size:
+                self._update_used()
+                self._evict()
+    #-------------------------------------------------------------------
+    def _update_used(self) -> None:
+        '''Writes use times of the texts found since last write'''
+        self._connection.executemany(
+            'UPDATE renders SET used = ? WHERE digest = ?',
+            [(used, digest) for digest, used in self._used.items()])
+        self._used.clear()
+    #-------------------------------------------------------------------
+    def _evict(self) -> None:
+        '''Removes least recently used entries until 3/4 of max_size'''
+        connection = self._connection
+        self._size = connection.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM renders').fetchone()[0]
+        target = self.max_size * 3 // 4
+        removed = []
+        for digest, size in connection.execute(
+                'SELECT digest, size FROM renders ORDER BY used'):
+            if self._size <= target:
+                break
+            removed.append((digest,))
+            self._size -= size
+        connection.executemany('DELETE FROM renders WHERE digest = ?', removed)
+    #-------------------------------------------------------------------
+    def flush(self) -> None:
+        '''Writes use times of the found texts to the file'''
+        with self._connection:
+            self._update_used()
+    #-------------------------------------------------------------------
+    def close(self) -> None:
+        self.flush()
+        self._connection.close()
+    #-------------------------------------------------------------------
+    def __enter__(self):
+        return self
+    #-------------------------------------------------------------------
+    def __exit__(self, *_) -> None:
+        self.close()
+#-----------------------------------------------------------------------
+_render_cache: _Optional[RenderCache] = None
+#-----------------------------------------------------------------------
+def set_render_cache(cache: RenderCache | _pathlib.Path | str | None
+                     ) -> _Optional[RenderCache]:
+    '''Sets persistent cache used when rendering documents
+
+    Parameters
+    ----------
+    cache : RenderCache | pathlib.Path | str | None
+        Cache or path of the cache file. None disables the cache
+
+    Returns
+    -------
+    RenderCache | None
+        The cache in use
+    '''
+    global _render_cache
+    if cache is not None and not isinstance(cache, RenderCache):
+        cache = RenderCache(cache)
+    _render_cache = cache
+    return cache
 #=======================================================================
-def _process_references(references: dict[tuple[str, str], list[Link]]) -> str:
-    '''Makes reference list text from collected link references and updates
-    and their indices'''
-    reflines = []
-    for index, ((target, title), links) in enumerate(references.items(),
-                                                        start = 1):
-        reflines.append(f'[{index}]: <{target}> "{title}"')
-        # Adding same index to all links with same text
-        for link in links:
-            link._index = index
-    return '\n'.join(reflines)
+class _RenderIndex:
+    '''Numbers footnotes and link references while a document is rendered
+
+    Numbers are given in order of first appearance, so they are known
+    when the footnote or link is written. Note and reference lines
+    are kept until written out after the item.
+
+    Collectable elements are rendered via cache. Each cached render records
+    the footnotes and links registered in it, so that the cached text
+    is reused only if they get the same numbers again.
+    '''
+    __slots__ = ('footnotes', 'references', 'notes', 'reflines',
+                 'is_in_note', 'recorders', 'store', 'digests', 'kept')
+    def __init__(self) -> None:
+        self.footnotes: dict[str, int] = {}
+        self.references: dict[tuple[str, str], int] = {}
+        self.notes: list[str] = []
+        self.reflines: list[str] = []
+        self.is_in_note = False # Links in notes are shown inline
+        # Registrations for cache of each element being rendered
+        self.recorders: list[list[list]] = []
+        self.store = _render_cache
+        self.digests: dict[int, str] = {} # Memo for digest of store
+        self.kept: set[int] = set() # Elements written with kept text
+    #-------------------------------------------------------------------
+    def _record(self, event: list) -> None:
+        if self.recorders:
+            self.recorders[-1].append(event)
+    #-------------------------------------------------------------------
+    def footnote(self, footnote: Footnote) -> int:
+        token = _render_index.set(None) # Key is made without numbering
+        try:
+            key = str(footnote.content)
+        finally:
+            _render_index.reset(token)
+        # [element, key, index, new line or None, index of the element]
+        index = self.footnotes.get(key)
+        event: list[_Any] = [footnote, key, index, None, 0]
+        self._record(event)
+        if index is None:
+            index = event[2] = self.footnotes[key] = len(self.footnotes) + 1
+            # Reserving the line so that nested footnotes come after
+            slot = len(self.notes)
+            self.notes.append('')
+            was_in_note, self.is_in_note = self.is_in_note, True
+            try:
+                self.notes[slot] = event[3] = f'[^{index}]: {footnote.content}'
+            finally:
+                self.is_in_note = was_in_note
+        event[4] = index
+        return index
+    #-------------------------------------------------------------------
+    def reference(self, link: Link) -> int:
+        key = (str(link.target), str(link.title))
+        index = self.references.get(key)
+        event: list[_Any] = [link, key, index, None, 0]
+        self._record(event)
+        if index is None:
+            index = event[2] = self.references[key] = len(self.references) + 1
+            line = event[3] = f'[{index}]: <{key[0]}> "{key[1]}"'
+            self.reflines.append(line)
+        if self.is_in_note:
+            return 0
+        event[4] = index
+        return index
+    #-------------------------------------------------------------------
+    def _replay(self, events: tuple[list, ...]) -> bool:
+        '''Registers recorded footnotes and links if they would get
+        the same numbers as when recorded'''
+        n_new = {Footnote: len(self.footnotes), Link: len(self.references)}
+        new: dict[tuple[type, _Any], int] = {}
+        for element, key, index, line, _ in events:
+            kind = Footnote if isinstance(element, Footnote) else Link
+            known = self.footnotes if kind is Footnote else self.references
+            if (current := known.get(key, new.get((kind, key)))) is None:
+                if line is None:
+                    return False
+                current = new[(kind, key)] = n_new[kind] = n_new[kind] + 1
+            elif line is not None:
+                return False
+            if current != index:
+                return False
+
+        for element, key, index, line, element_index in events:
+            element._index = element_index
+            if line is not None:
+                if isinstance(element, Footnote):
+                    self.footnotes[key] = index
+                    self.notes.append(line)
+                else:
+                    self.references[key] = index
+                    self.reflines.append(line)
+        return True
+    #-------------------------------------------------------------------
+    def render_cached(self, element: CollectableElement, writer: _Writer
+                      ) -> None:
+        '''Writes kept text of the element if nothing in it has changed
+        since and otherwise renders it, keeping the text if render caching
+        is on'''
+        if ((cache := element._rendered) is not None
+            and _is_unchanged(element, cache[0], cache[3])
+            and self._replay(cache[2])):
+            self.kept.add(id(element))
+            return self._write(cache[1], cache[2], writer)
+        digest: _Optional[str] = None
+        if (self.store is not None
+              and element._is_stored
+              and (digest := _stable_digest(element, self.digests))
+              is not None
+              and (text := self.store.get(digest)) is not None):
+            # Stored text has no footnotes or references
+            events: tuple[list, ...] = ()
+        else:
+            self.recorders.append([])
+            buffer = _StringIO()
+            try:
+                element.render_into(buffer)
+            finally:
+                events = tuple(self.recorders.pop())
+            text = buffer.getvalue()
+            if digest is not None and not events:
+                self.store.put(digest, text) # type: ignore
+        element._rendered = None
+        if _is_render_caching:
+            try:
+                element._rendered = (next(_render_stamps), text, events,
+                                     _tree_snapshot(element, self.kept))
+                self.kept.add(id(element))
+            except _Uncacheable:
+                pass
+        self._write(text, events, writer)
+    #-------------------------------------------------------------------
+    def _write(self, text: str, events: tuple[list, ...], writer: _Writer
+               ) -> None:
+        if self.recorders:
+            self.recorders[-1].extend(events)
+        writer.write(text)
+#-----------------------------------------------------------------------
+_is_render_caching = False
+#-----------------------------------------------------------------------
+def set_render_caching(is_on: bool = True) -> None:
+    '''Sets whether collectable elements keep their text between document
+    renders, so that only changed elements are rendered again
+
+    Changes are found by comparing the values of the fields to copies
+    made at render, so they need not be marked with invalidate. Each kept
+    element holds its text and copies of its own values, e.g. of table rows,
+    but not of the values in kept elements inside it. So memory use is about
+    the size of the rendered text plus that of the element content. Memory
+    is released when elements are rendered with caching off.
+
+    Parameters
+    ----------
+    is_on : bool, default True
+        Whether to keep the text. Off by default
+    '''
+    global _is_render_caching
+    _is_render_caching = is_on
+#-----------------------------------------------------------------------
+class _Same:
+    '''Equal only to wrapper of the same object'''
+    __slots__ = ('item',)
+    def __init__(self, item: _Any) -> None:
+        self.item = item
+    #-------------------------------------------------------------------
+    def __eq__(self, other: _Any) -> bool:
+        return isinstance(other, _Same) and other.item is self.item
+    #-------------------------------------------------------------------
+    def __hash__(self) -> int:
+        return id(self.item)
+#-----------------------------------------------------------------------
+class _Kept(_NamedTuple):
+    '''Element with text kept on its own, in snapshot of containing one'''
+    element: 'CollectableElement'
+    stamp: int
+#-----------------------------------------------------------------------
+class _Uncacheable(Exception):
+    '''Value cannot be compared to its state at render'''
+#-----------------------------------------------------------------------
+def _snapshot(value: _Any) -> _Any:
+    '''Copy of the value for finding changes made in place
+
+    Elements are compared by identity, as their own fields are compared
+    separately. Other objects are compared by their str'''
+    kind = type(value)
+    if kind in _plain_types:
+        return value
+    if kind is list or kind is tuple:
+        if (types := set(map(type, value))) <= _plain_types:
+            return tuple(value)
+        if types <= _sequence_types: # Fast for rows of values
+            rows = tuple(map(tuple, value))
+            cells = _itertools.chain.from_iterable(rows)
+            if set(map(type, cells)) <= _plain_types:
+                return rows
+        return tuple(map(_snapshot, value))
+    if isinstance(value, Element):
+        return _Same(value)
+    if _is_array(value):
+        if value.dtype.kind == 'O':
+            return tuple(map(_snapshot, value))
+        return (value.dtype.str, value.shape, value.tobytes())
+    if isinstance(value, Columns):
+        return (Columns, _snapshot(value.columns))
+    if isinstance(value, EncodedColumn):
+        return (EncodedColumn, value.codes.tobytes(), tuple(value.values))
+    if isinstance(value, CSVRows): # File identified by path and stat
+        return (CSVRows, repr(value), value._stat)
+    if isinstance(value, (list, tuple)):
+        return tuple(map(_snapshot, value))
+    if isinstance(value, dict):
+        return tuple((key, _snapshot(item)) for key, item in value.items())
+    if isinstance(value, set):
+        return frozenset(value)
+    if isinstance(value, _Iterator): # Consumed by render
+        raise _Uncacheable(value)
+    # Dataclasses, e.g. TableSchema
+    if (names := _digest_fields(kind)) is not None: # type: ignore
+        return (kind, *(_snapshot(getattr(value, name)) for name in names))
+    return (kind, str(value)) # Rendered with str, so that is the content
+#-----------------------------------------------------------------------
+def _fields_snapshot(element: Element) -> _Any:
+    '''Values of the fields rendered from'''
+    if (names := _digest_fields(type(element))) is None: # type: ignore
+        # Subclass not being dataclass may have any attributes
+        return str(element)
+    return tuple([_snapshot(getattr(element, name)) for name in names])
+#-----------------------------------------------------------------------
+def _tree_snapshot(element: CollectableElement, kept: set[int]) -> list:
+    '''Values of the fields of the element and of elements in it in walk
+    order. Elements written with kept text are referred to instead'''
+    snapshot = [_fields_snapshot(element)]
+    is_kept = lambda _: type(snapshot[-1]) is _Kept
+    for item in _walk(element._children(), set(), is_kept):
+        if (id(item) in kept
+            and (cache := getattr(item, '_rendered', None)) is not None):
+            snapshot.append(_Kept(item, cache[0])) # type: ignore
+        else:
+            snapshot.append(_fields_snapshot(item))
+    return snapshot
+#-----------------------------------------------------------------------
+def _is_appended(old: tuple, new: tuple) -> bool:
+    '''Checks that field values differ only by items appended to them'''
+    return all(new_value == old_value
+               or (type(old_value) is tuple and type(new_value) is tuple
+                   and new_value[:len(old_value)] == old_value)
+               for old_value, new_value in zip(old, new))
+#-----------------------------------------------------------------------
+def _is_unchanged(element: CollectableElement, stamp: int, snapshot: list
+                  ) -> bool:
+    '''Checks that element and its content are unchanged since stamp and
+    have the same values as in the snapshot
+
+    Element changed in place is invalidated, so that e.g. table does not
+    reuse its converted rows'''
+    try:
+        values = _fields_snapshot(element)
+        if values != snapshot[0]:
+            if not (type(values) is tuple and _is_appended(snapshot[0], values)):
+                element.invalidate()
+            return False
+        if element._changed > stamp:
+            return False
+        position = 0
+        is_kept = lambda _: type(snapshot[position]) is _Kept
+        for item in _walk(element._children(), set(), is_kept):
+            position += 1
+            if position == len(snapshot):
+                return False
+            if type(entry := snapshot[position]) is _Kept:
+                if (entry.element is not item
+                    or (cache := item._rendered) is None # type: ignore
+                    or cache[0] != entry.stamp
+                    or not _is_unchanged(item, cache[0], cache[3])):
+                    return False
+            elif item._changed > stamp or _fields_snapshot(item) != entry:
+                element.invalidate() # Element inside changed
+                return False
+        return position + 1 == len(snapshot)
+    except _Uncacheable:
+        return False
+#-----------------------------------------------------------------------
+# Set during document render, separately in each thread
+_render_index: _ContextVar[_Optional[_RenderIndex]] = _ContextVar(
+    '_render_index', default = None)
 #=======================================================================
 def _process_header(language: _Any, content: _Any) -> str:
     language = str(language).strip().lower()
@@ -974,7 +3223,247 @@ def _process_TOC(TOCs: dict[int, list[TOC]],
         for toc in toclist:
             toc._text = text
 #=======================================================================
-@_dataclass(validate = _IS_VALIDATION, **_maybeslots) # type: ignore
+_SPILL_CHUNK = 1 << 16
+#-----------------------------------------------------------------------
+def _spill() -> _TextIO:
+    '''Temporary file for text that is written out later'''
+    return _tempfile.TemporaryFile('w+', encoding = 'utf8', newline = '') # type: ignore
+#-----------------------------------------------------------------------
+def _copy_spill(spill: _TextIO, writer: _Writer) -> None:
+    spill.seek(0)
+    while chunk := spill.read(_SPILL_CHUNK):
+        writer.write(chunk)
+#-----------------------------------------------------------------------
+def _flush_lines(lines: list[str], buffer: _TextIO) -> None:
+    if lines:
+        if buffer.tell():
+            buffer.write('\n')
+        buffer.write('\n'.join(lines))
+        lines.clear()
+#-----------------------------------------------------------------------
+def _render_document(content: _Iterable[_Any],
+                     header: tuple[()] | tuple[_Any, _Any],
+                     writer: _Writer,
+                     buffer: _Callable[[], _TextIO]) -> None:
+    '''Renders document content in one pass
+
+    Footnotes and link references are numbered while rendering.
+    Note and reference lines and text after a TOC are written to buffers
+    made by the buffer factory and written out at the end,
+    when the TOC text is known.
+    '''
+    TOCs: dict[int, list[TOC]] = _defaultdict(list)
+    top_level = 0
+    headings: list[Heading] = []
+    segments: list[tuple[TOC, _TextIO]] = [] # Buffered text after TOC
+    index = _RenderIndex()
+    token = _render_index.set(index)
+
+    try:
+        with _ExitStack() as stack:
+            notes = stack.enter_context(buffer())
+            references = stack.enter_context(buffer())
+            target = writer
+            separator = ''
+            if header:
+                writer.write(_process_header(*header))
+                separator = '\n\n'
+
+            for item in _flatten(content):
+                target.write(separator)
+                separator = '\n\n'
+
+                if isinstance(item, str):
+                    target.write(_sanitise(item).strip())
+                    continue
+                if isinstance(item, Section):
+                    item.level = 1
+                if isinstance(item, TOC):
+                    TOCs[item.level].append(item)
+                    target = stack.enter_context(buffer())
+                    segments.append((item, target))
+                    continue
+                if isinstance(item, Heading) and item.in_TOC:
+                    headings.append(item)
+                    if item.level < top_level or not top_level:
+                        top_level = item.level
+
+                _render(item, target)
+                _flush_lines(index.notes, notes)
+                _flush_lines(index.reflines, references)
+
+            if TOCs and headings: # Creating TOC
+                _process_TOC(TOCs, headings, top_level)
+                _flush_lines(index.notes, notes)
+                _flush_lines(index.reflines, references)
+
+            for toc, buffered in segments:
+                _render(toc, writer)
+                _copy_spill(buffered, writer)
+
+            for buffered, is_used in ((notes, index.footnotes),
+                                      (references, index.references)):
+                if is_used:
+                    writer.write(separator)
+                    separator = '\n\n'
+                    _copy_spill(buffered, writer)
+    finally:
+        _render_index.reset(token)
+        if index.store is not None:
+            index.store.flush()
+#-----------------------------------------------------------------------
+def _validated(item: _Any) -> _Any:
+    '''Item after validating objects in it pending from deferred
+    validation'''
+    validate_tree(item)
+    return item
+#-----------------------------------------------------------------------
+def _default_file_mode() -> int:
+    '''Permissions of a new file from umask'''
+    umask = _os.umask(0)
+    _os.umask(umask)
+    return 0o666 & ~umask
+#-----------------------------------------------------------------------
+class _GzipTextWriter(_TextIOWrapper):
+    '''Text writer into gzip file with reproducible header'''
+    def __init__(self, path: str) -> None:
+        self._file = open(path, 'wb')
+        try:
+            # No name or time in the header, so same text gives same bytes
+            super().__init__(_gzip.GzipFile(filename = '', mode = 'wb',
+                                            fileobj = self._file, mtime = 0))
+        except BaseException:
+            self._file.close()
+            raise
+    #-------------------------------------------------------------------
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            self._file.close()
+#-----------------------------------------------------------------------
+def _open_gzip(path: str, mode: str) -> _TextIO:
+    return (_gzip.open(path, 'rt') if mode == 'r' # type: ignore
+            else _GzipTextWriter(path))
+#-----------------------------------------------------------------------
+_openers: dict[_Optional[str], _Callable[[str, str], _TextIO]] = {
+    None: open, # type: ignore
+    'gzip': _open_gzip,
+    'bz2': lambda path, mode: _bz2.open(path, f'{mode}t'), # type: ignore
+    'xz': lambda path, mode: _lzma.open(path, f'{mode}t')} # type: ignore
+_compression_suffixes = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz'}
+# Errors from reading corrupted or differently compressed file
+_read_errors = (OSError, EOFError, ValueError, _lzma.LZMAError)
+#-----------------------------------------------------------------------
+class _UpdatingWriter:
+    '''Writer that compares text to the existing file and writes only
+    after they differ, into temporary file that replaces the file at end'''
+    __slots__ = ('path', 'opener', 'existing', 'n_matched',
+                 'file', 'temp_path')
+    def __init__(self, path: _pathlib.Path,
+                 opener: _Callable[[str, str], _TextIO]) -> None:
+        self.path = path
+        self.opener = opener
+        self.n_matched = 0 # Characters matching the existing file
+        self.file: _Optional[_TextIO] = None
+        self.temp_path: _Optional[str] = None
+        try:
+            self.existing: _Optional[_TextIO] = opener(str(path), 'r')
+        except FileNotFoundError:
+            self.existing = None
+            self._start()
+    #-------------------------------------------------------------------
+    def _matches(self, text: str) -> bool:
+        try:
+            return self.existing.read(len(text)) == text # type: ignore
+        except _read_errors:
+            return False
+    #-------------------------------------------------------------------
+    def write(self, text: str) -> None:
+        if self.file is None:
+            if self._matches(text):
+                self.n_matched += len(text)
+                return
+            self._start()
+        self.file.write(text) # type: ignore
+    #-------------------------------------------------------------------
+    def _start(self) -> None:
+        '''Starts temporary file from the text matched so far'''
+        descriptor, self.temp_path = _tempfile.mkstemp(
+            dir = self.path.parent, prefix = f'.{self.path.name}.')
+        _os.close(descriptor)
+        self.file = self.opener(self.temp_path, 'w')
+        if (existing := self.existing) is not None:
+            existing.seek(0)
+            n_remaining = self.n_matched
+            while n_remaining:
+                chunk = existing.read(min(n_remaining, _SPILL_CHUNK))
+                self.file.write(chunk)
+                n_remaining -= len(chunk)
+            existing.close()
+            self.existing = None
+    #-------------------------------------------------------------------
+    def commit(self) -> bool:
+        '''Replaces the file if text differs
+
+        Returns
+        -------
+        bool
+            True if the file was written
+        '''
+        if self.existing is not None:
+            try:
+                is_longer = bool(self.existing.read(1))
+            except _read_errors:
+                is_longer = True
+            if not is_longer: # Same length and content
+                self.existing.close()
+                return False
+            self._start()
+        self.file.close() # type: ignore
+        try:
+            mode = _os.stat(self.path).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = _default_file_mode()
+        _os.chmod(self.temp_path, mode) # type: ignore
+        _os.replace(self.temp_path, self.path) # type: ignore
+        return True
+    #-------------------------------------------------------------------
+    def abort(self) -> None:
+        '''Closes files and removes the temporary file'''
+        if self.existing is not None:
+            self.existing.close()
+        if self.file is not None:
+            self.file.close()
+            _os.remove(self.temp_path) # type: ignore
+#-----------------------------------------------------------------------
+def _write_file(element: Element,
+                path: _pathlib.Path | str,
+                compression: _Optional[str] = 'infer') -> bool:
+    '''Renders the element into the file with trailing newline,
+    unless the file already has the same text
+
+    Returns
+    -------
+    bool
+        True if the file was written
+    '''
+    path = _pathlib.Path(path)
+    if compression == 'infer':
+        compression = _compression_suffixes.get(path.suffix.lower())
+    if compression not in _openers:
+        raise ValueError(f"compression must be 'infer', None, 'gzip', 'bz2'"
+                         f" or 'xz', not {compression!r}")
+    writer = _UpdatingWriter(path, _openers[compression])
+    try:
+        element.render_into(writer)
+        writer.write('\n')
+        return writer.commit()
+    except BaseException:
+        writer.abort()
+        raise
+#=======================================================================
+@_dataclass(validate = True, **_maybeslots) # type: ignore
 class Document(IterableElement):
     '''Highest level collection of elements.
     Each piece is separated by empty line
@@ -1004,33 +3493,56 @@ class Document(IterableElement):
             self.content += other.content
         else:
             self.content.append(other)
-        return self
+        return self.invalidate()
     #-------------------------------------------------------------------
-    def __str__(self) -> str:
-        (content,
-         TOCs,
-         top_level,
-         headings,
-         links,
-         footnotes) = _preprocess_document(self.content)
-        if self.header: # Making header
-            content.insert(0, _process_header(*self.header))
-
-        if footnotes: # Handling footnotes
-            content.append(_process_footnotes(footnotes))
-
-        if links: # Handling link references
-            content.append(_process_references(links))
+    def walk(self) -> _Generator[Element, None, None]:
+        '''Iterates depth first over all elements in the document
+
+        Each element is yielded once, parents before their content.
+        Sections are flattened into their headings and content.
+        Traversal does not recurse, so deeply nested documents are fine.
+
+        Yields
+        ------
+        Element
+            Elements in preorder
+
+        Examples
+        --------
+        >>> document = Document([Paragraph(['a', Footnote('b')])])
+        >>> [type(element).__name__ for element in document.walk()]
+        ['Paragraph', 'Footnote']
+        '''
+        return _walk(_flatten(self.content), set())
+    #-------------------------------------------------------------------
+    def render_into(self, writer: _Writer) -> None:
+        validate_tree(self) # Objects pending from deferred validation
+        _render_document(self.content, self.header, writer, _StringIO)
+    #-------------------------------------------------------------------
+    def to_file(self,
+                path: _pathlib.Path | str,
+                compression: _Optional[str] = 'infer') -> bool:
+        '''Streams the document text to the file
 
-        if TOCs and headings: # Creating TOC
-            _process_TOC(TOCs, headings, top_level)
+        File is left untouched if it already has the same text.
+        Otherwise it is replaced atomically, so it is never partially written.
 
-        return '\n\n'.join(str(item) for item in content)
-    #-------------------------------------------------------------------
-    def to_file(self, path: _pathlib.Path) -> int:
-        return path.write_text(str(self) + '\n')
+        Parameters
+        ----------
+        path : pathlib.Path | str
+            Path of the file
+        compression : str | None, default 'infer'
+            'gzip', 'bz2', 'xz' or None. By default inferred from
+            suffix .gz, .bz2 or .xz
+
+        Returns
+        -------
+        bool
+            True if the file was written, False if it was unchanged
+        '''
+        return _write_file(self, path, compression)
 #=======================================================================
-@_dataclass(validate = _IS_VALIDATION, **_maybeslots) # type: ignore
+@_dataclass(validate = True, **_maybeslots) # type: ignore
 class Section(GroupElement):
     _title: _InitVar
     front: list[_Any] = _field(default_factory = list)
@@ -1043,11 +3555,13 @@ class Section(GroupElement):
     #-------------------------------------------------------------------
     def _set_title(self, title: _Any) -> None:
         self._heading.content = title
+        self._heading.invalidate()
 
     title = property(lambda self: self._heading.content, _set_title)
     #-------------------------------------------------------------------
     def _set_level(self, level) -> None:
         self._heading.level = level
+        self._heading.invalidate()
         sublevel = level - 1
         for subsection in self.subsections:
             subsection.level = sublevel
@@ -1056,6 +3570,7 @@ class Section(GroupElement):
     #-------------------------------------------------------------------
     def _set_in_TOC(self, state: bool) -> None:
         self._heading.in_TOC = state
+        self._heading.invalidate()
         if not state:
             for subsection in self.subsections:
                 subsection.in_TOC = False
@@ -1064,6 +3579,7 @@ class Section(GroupElement):
     #-------------------------------------------------------------------
     def _set_alt_style(self, state: bool) -> None:
         self._heading.alt_style = state
+        self._heading.invalidate()
 
     alt_style = property(lambda self: self._heading.alt_style, _set_alt_style)
     #-------------------------------------------------------------------
@@ -1082,10 +3598,10 @@ class Section(GroupElement):
             self.subsections.append(other)
         else:
             self.front.append(other)
-        return self
+        return self.invalidate()
     #-------------------------------------------------------------------
-    def __str__(self) -> str:
-        return str(self.document_cls([self._flatten()]))
+    def render_into(self, writer: _Writer) -> None:
+        self.document_cls([self]).render_into(writer)
     #-------------------------------------------------------------------
     def _flatten(self) -> _Generator[_Any, None, None]:
         yield self._heading
@@ -1093,7 +3609,55 @@ class Section(GroupElement):
         for subsection in self.subsections:
             yield from subsection._flatten()
     #-------------------------------------------------------------------
-    def _collect(self, visited: set[int]) -> tuple[set[int], _Collected]:
-        visited, collected = _collect(self._heading, visited, _empty_collected())
-        visited, collected = _collect_iter(self.front, visited, collected)
-        return _collect_iter(self.subsections, visited, collected)
+    def _children(self) -> _Iterable[_Any]:
+        return _itertools.chain((self._heading,), self.front, self.subsections)
+#=======================================================================
+@_dataclass(validate = True, **_maybeslots) # type: ignore
+class StreamDocument(Element):
+    '''Document whose content is rendered while being iterated.
+
+    Each top level item is written out as soon as it arrives, so content
+    can be e.g. a generator and memory use stays in proportion to one item.
+    Footnotes and link references are spilled into temporary files and
+    appended at the end. Content after a TOC is spilled as well
+    until the TOC text is known.
+    Content iterable is consumed by rendering.
+
+    Parameters
+    ----------
+    content: Iterable[Any]
+        Content of the document. Can be made of anything convertible to strings
+    header_language_and_text: tuple[()] | tuple[Any, Any]
+        Header language and text. If you want a header written in
+        e.g. yaml, then ("yaml", yaml_string)
+    '''
+    content: _Iterable[_Any]
+    header: tuple[()] | tuple[_Any, _Any] = _field(
+                                        default_factory = tuple) # type: ignore
+    #-------------------------------------------------------------------
+    def render_into(self, writer: _Writer) -> None:
+        _render_document(map(_validated, self.content),
+                         self.header, writer, _spill)
+    #-------------------------------------------------------------------
+    def to_file(self,
+                path: _pathlib.Path | str,
+                compression: _Optional[str] = 'infer') -> bool:
+        '''Streams the document text to the file
+
+        File is left untouched if it already has the same text.
+        Otherwise it is replaced atomically, so it is never partially written.
+
+        Parameters
+        ----------
+        path : pathlib.Path | str
+            Path of the file
+        compression : str | None, default 'infer'
+            'gzip', 'bz2', 'xz' or None. By default inferred from
+            suffix .gz, .bz2 or .xz
+
+        Returns
+        -------
+        bool
+            True if the file was written, False if it was unchanged
+        '''
+        return _write_file(self, path, compression)
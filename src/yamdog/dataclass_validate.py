@@ -1,16 +1,29 @@
+from collections import defaultdict as _defaultdict
 from collections.abc import Collection as _Collection
 from collections.abc import Mapping as _Mapping
+from collections.abc import Sequence as _Sequence
 from dataclasses import *
 from dataclasses import dataclass as _dataclass_std
+from functools import cache as _cache
+from functools import partial as _partial
 from functools import wraps
+from inspect import Parameter as _Parameter
+from inspect import signature as _signature
+from itertools import islice as _islice
+from itertools import repeat as _repeat
+from random import Random as _Random
+from reprlib import Repr as _Repr
 from sys import version_info as _version_info
 from typing import _GenericAlias as __GenericAlias # type: ignore
 from typing import Any as _Any
 from typing import Callable as _Callable
 from typing import ClassVar as _ClassVar
-from typing import GenericAlias as _GenericAlias # type: ignore
 from typing import Iterable as _Iterable
+from typing import get_args as _get_args
+from typing import get_origin as _get_origin
 from typing import Protocol as _Protocol
+from typing import Union as _Union
+from weakref import ref as _ref
 
 if _version_info <= (3, 9):
     from typing import _UnionGenericAlias as _UnionType# type: ignore
@@ -22,9 +35,15 @@ del dataclass # type: ignore
 class _DataclassWrapped(_Protocol):
     __dataclass_fields__: dict[str, Field]
 # ----------------------------------------------------------------------
+# ERROR MESSAGES
+# These are run only after the check has failed.
+# Representations of values are truncated to keep the messages short
+_repr = _Repr()
+_repr.maxstring = _repr.maxother = 40
+# ----------------------------------------------------------------------
 def _basic(fieldtype, value: _Any) -> list[str]:
     return ([] if isinstance(value, fieldtype) else
-            [f"{value!r} is type '{type(value).__qualname__}',"
+            [f"{_repr.repr(value)} is type '{type(value).__qualname__}',"
              f" not '{fieldtype.__qualname__}'"])
 # ----------------------------------------------------------------------
 def _tuple(fieldtypes, values: _Any) -> list[str]:
@@ -33,17 +52,28 @@ def _tuple(fieldtypes, values: _Any) -> list[str]:
     if len(fieldtypes) == 2 and fieldtypes[-1] is Ellipsis:
         return _iterate(fieldtypes[0], values)
     if len(fieldtypes) != len(values):
-        return [f'Length of the tuple {values!r} not {len(fieldtypes)}']
-    errormessages = []
-    for fieldtype, subvalue in zip(fieldtypes, values):
-        errormessages.extend(_validate(fieldtype, subvalue))
-    return errormessages
+        return [f'Length of the tuple {_repr.repr(values)} '
+                f'not {len(fieldtypes)}']
+    for index, (fieldtype, subvalue) in enumerate(zip(fieldtypes, values)):
+        if not is_valid(fieldtype, subvalue):
+            return [f'item {index}:', *_validate(fieldtype, subvalue)]
+    return []
 # ----------------------------------------------------------------------
-def _iterate(fieldtype: type, values: _Iterable[_Any]) -> list[str]:
-    errormessages = []
-    for item in values:
-        errormessages.extend(_validate(fieldtype, item))
-    return errormessages
+def _iterate(fieldtype: type, values: _Collection[_Any]) -> list[str]:
+    '''Messages of the first invalid item'''
+    item_valid = _predicate(fieldtype)
+    if _sample_threshold is None or len(values) <= _sample_threshold:
+        for index, item in enumerate(values):
+            if not item_valid(item):
+                return [f'item {index}:', *_validate(fieldtype, item)]
+        return []
+    sample = _sample_items(values)
+    for index, item in sample:
+        if not item_valid(item):
+            return [f'item {index}:', *_validate(fieldtype, item),
+                    f'(validated sample of {len(sample)} '
+                    f'from {len(values)} items)']
+    return []
 # ----------------------------------------------------------------------
 def _generic_alias(fieldtype, value: _Any) -> list[str]:
     basetype = fieldtype.__origin__
@@ -51,31 +81,33 @@ def _generic_alias(fieldtype, value: _Any) -> list[str]:
         return errormessage
     if issubclass(basetype, tuple):
         return _tuple(fieldtype.__args__, value)
-    if issubclass(basetype, dict) and value:
+    if issubclass(basetype, _Mapping) and value:
         keytype, valuetype = fieldtype.__args__
         return (_iterate(keytype, value.keys())
-                + _iterate(valuetype, value.values()))
+                or _iterate(valuetype, value.values()))
     if issubclass(basetype, _Collection) and value:
         return _iterate(fieldtype.__args__[0], value)
     return []
 # ----------------------------------------------------------------------
 def _union(fieldtypes: tuple[type, ...], value: _Any) -> list[str]:
     '''If one of the types in the union matches'''
+    if any(is_valid(_type, value) for _type in fieldtypes):
+        return []
     errormessages = []
     for _type in fieldtypes:
-        if not (errormessage := _validate(_type, value)):
-            return []
-        errormessages.extend(errormessage)
+        errormessages.extend(_validate(_type, value))
     return errormessages
 # ----------------------------------------------------------------------
 def _validate(fieldtype: type, value: _Any) -> list[str]:
     if fieldtype == _Any:
         return []
-    if isinstance(fieldtype, _UnionType):
-        return _union(fieldtype.__args__, value)
-    if isinstance(fieldtype, _GenericAlias):
+    if (origin := _get_origin(fieldtype)) is None:
+        return _basic(fieldtype, value)
+    if origin is _Union or origin is _UnionType:
+        return _union(_get_args(fieldtype), value)
+    if isinstance(origin, type):
         return _generic_alias(fieldtype, value)
-    return _basic(fieldtype, value)
+    return []
 # ----------------------------------------------------------------------
 # ----------------------------------------------------------------------
 def _validate_fields(obj: _DataclassWrapped) -> None:
@@ -93,6 +125,8 @@ def _validate_fields(obj: _DataclassWrapped) -> None:
             continue
         if isinstance(_type, InitVar):
             _type = _type.type # type: ignore
+        if is_valid(_type, attribute):
+            continue
         if messages := _validate(_type, attribute):
             errormessages.append(f'{name}: {" ".join(messages)}')
     if errormessages:
@@ -100,30 +134,517 @@ def _validate_fields(obj: _DataclassWrapped) -> None:
                              f'{obj.__class__.__qualname__} '
                              'parameters not matching types')
         raise TypeError('\n    '.join(errormessages))
+# ======================================================================
+# COMPILING
+# Field types are compiled once at decoration time into checks.
+# A check is either
+#   - None, meaning that any value is valid
+#   - tuple of types, meaning that value is valid if isinstance passes
+#   - predicate function returning True if value is valid
+_Check = tuple[type, ...] | _Callable[[_Any], bool] | None
+# Collections longer than the threshold are validated only by a sample
+_sample_threshold: int | None = None
+_sample_size = 8
+# Maximum number of nested levels of generic types validated
+_max_depth: int | None = None
 # ----------------------------------------------------------------------
-def validate(cls: type):
-    '''Validate after 'init', 'post_init' or not at all (`None`)
+def _sample_items(values: _Collection) -> list[tuple[int, _Any]]:
+    '''Samples first, last and random items with their indices.
+    Collections without indexing are sampled only from the beginning'''
+    size = _sample_size
+    if not isinstance(values, _Sequence):
+        return list(enumerate(_islice(values, size)))
+    if (length := len(values)) <= 3 * size:
+        return list(enumerate(values))
+    # Seeding with the length so that error message is built
+    # from the same sample as the check
+    middle = _Random(length).sample(range(size, length - size), size)
+    return [(index, values[index]) for index
+            in (*range(size), *sorted(middle), *range(length - size, length))]
+# ----------------------------------------------------------------------
+def _as_predicate(check: tuple[type, ...] | _Callable[[_Any], bool]
+                  ) -> _Callable[[_Any], bool]:
+    if isinstance(check, tuple):
+        return lambda value: isinstance(value, check) # type: ignore
+    return check
+# ----------------------------------------------------------------------
+def _all_items(check: tuple[type, ...] | _Callable[[_Any], bool]
+               ) -> _Callable[[_Any], bool]:
+    if isinstance(check, tuple):
+        items_valid = lambda values: all(map(isinstance, values,
+                                             _repeat(check)))
+    else:
+        items_valid = lambda values: all(map(check, values)) # type: ignore
+    if (threshold := _sample_threshold) is None:
+        return items_valid
+    return lambda values: items_valid(
+        values if len(values) <= threshold
+        else (item for _, item in _sample_items(values)))
+# ----------------------------------------------------------------------
+def _compile_tuple(fieldtypes: tuple[_Any, ...], depth: int) -> _Check:
+    if len(fieldtypes) == 2 and fieldtypes[-1] is Ellipsis:
+        if (check := _compile(fieldtypes[0], depth)) is None:
+            return (tuple,)
+        items_valid = _all_items(check)
+        return lambda value: isinstance(value, tuple) and items_valid(value)
+
+    length = len(fieldtypes)
+    checks = tuple((index, _as_predicate(check))
+                   for index, fieldtype in enumerate(fieldtypes)
+                   if (check := _compile(fieldtype, depth)) is not None)
+    if not checks:
+        return lambda value: isinstance(value, tuple) and len(value) == length
+    return lambda value: (isinstance(value, tuple)
+                          and len(value) == length
+                          and all(check(value[index])
+                                  for index, check in checks))
+# ----------------------------------------------------------------------
+def _compile_generic_alias(basetype: type,
+                           fieldtypes: tuple[_Any, ...],
+                           depth: int) -> _Check:
+    if _max_depth is not None and depth > _max_depth:
+        return (basetype,)
+    if issubclass(basetype, tuple):
+        return _compile_tuple(fieldtypes, depth)
+    if issubclass(basetype, _Mapping):
+        keycheck, valuecheck = (_compile(fieldtype, depth)
+                                for fieldtype in fieldtypes)
+        if keycheck is None and valuecheck is None:
+            return (basetype,)
+        keys_valid = (None if keycheck is None else _all_items(keycheck))
+        values_valid = (None if valuecheck is None
+                        else _all_items(valuecheck))
+        return lambda value: (isinstance(value, basetype)
+                              and (keys_valid is None
+                                   or keys_valid(value.keys()))
+                              and (values_valid is None
+                                   or values_valid(value.values())))
+    if (issubclass(basetype, _Collection)
+        and (check := _compile(fieldtypes[0], depth)) is not None):
+        items_valid = _all_items(check)
+        return lambda value: isinstance(value, basetype) and items_valid(value)
+    return (basetype,)
+# ----------------------------------------------------------------------
+def _compile_union(fieldtypes: tuple[_Any, ...], depth: int) -> _Check:
+    checks = [_compile(fieldtype, depth) for fieldtype in fieldtypes]
+    if any(check is None for check in checks):
+        return None
+    classinfo = tuple(cls for check in checks if isinstance(check, tuple)
+                      for cls in check)
+    predicates = tuple(check for check in checks if callable(check))
+    if not predicates:
+        return classinfo
+    return lambda value: (isinstance(value, classinfo)
+                          or any(predicate(value) for predicate in predicates))
+# ----------------------------------------------------------------------
+def _compile(fieldtype: _Any, depth: int = 0) -> _Check:
+    '''Compiles field type into a check
+
+    Parameters
+    ----------
+    fieldtype : Any
+        Type annotation
+    depth : int, default 0
+        How many levels of generic types are above this type
     '''
-    #─────────────────────────────────────────────────────────────────────────
-    # Creating a new wrapper to wrap the original dataclass wrapper
-    # to wrap init or post_init
-
-    if hasattr(cls, '__post_init__'):
-        method_name = '__post_init__'
-        original_method = getattr(cls, method_name)
-        @wraps(original_method)
-        def validation_wrap(self, *args, **kwargs) -> None:
-            _validate_fields(self)
-            original_method(self, *args, **kwargs)
+    if fieldtype is _Any:
+        return None
+    if (origin := _get_origin(fieldtype)) is None:
+        return (fieldtype,)
+    if origin is _Union or origin is _UnionType:
+        return _compile_union(_get_args(fieldtype), depth)
+    if isinstance(origin, type):
+        return _compile_generic_alias(origin, _get_args(fieldtype), depth + 1)
+    return None
+# ----------------------------------------------------------------------
+@_cache
+def _predicate(fieldtype: _Any) -> _Callable[[_Any], bool]:
+    return (_always_valid if (check := _compile(fieldtype)) is None
+            else _as_predicate(check))
+_always_valid = lambda value: True
+# ----------------------------------------------------------------------
+def is_valid(fieldtype: _Any, value: _Any) -> bool:
+    '''Checks whether the value matches the type annotation
+    without building any error messages'''
+    return _predicate(fieldtype)(value)
+# ----------------------------------------------------------------------
+def _compile_condition(cls: type, selfname: str, parameters: set[str]
+                       ) -> tuple[str, dict[str, _Any]]:
+    '''Makes source code of an expression that is True
+    if all fields of the object are valid
+
+    Parameters
+    ----------
+    cls : type
+        Dataclass whose fields are validated
+    selfname : str
+        Name of the object in the generated code
+    parameters : set[str]
+        Names of the fields that can be read directly from
+        the parameters of the generated method
+
+    Returns
+    -------
+    tuple[str, dict[str, Any]]
+        Source code of the expression and the namespace it needs
+    '''
+    terms = []
+    namespace: dict[str, _Any] = {}
+    for index, field in enumerate(fields(cls)):
+        if not field.init and field.default_factory is MISSING:
+            # Either not yet set when the validation is run
+            # or still the plain default
+            continue
+        if (check := _compile(field.type)) is None:
+            continue
+        name = f'_check{index}'
+        namespace[name] = check
+        value = (field.name if (field.name in parameters
+                                and field.default_factory is MISSING)
+                 else f'{selfname}.{field.name}')
+        terms.append(f'isinstance({value}, {name})'
+                     if isinstance(check, tuple) else f'{name}({value})')
+    return ' and '.join(terms), namespace
+# ----------------------------------------------------------------------
+def _mirror_signature(function: _Callable) -> tuple[list[str], str, str]:
+    '''Makes parameter list and call arguments source code
+    matching the signature of the function
+
+    Returns
+    -------
+    tuple[list[str], str, str]
+        Parameter names, parameter list and call arguments
+    '''
+    names = []
+    parameters = []
+    arguments = []
+    previous_kind = None
+    for parameter in _signature(function).parameters.values():
+        name, kind = parameter.name, parameter.kind
+        names.append(name)
+        if (previous_kind is _Parameter.POSITIONAL_ONLY
+            and kind is not _Parameter.POSITIONAL_ONLY):
+            parameters.append('/')
+        if kind is _Parameter.VAR_POSITIONAL:
+            parameters.append(f'*{name}')
+            arguments.append(f'*{name}')
+        elif kind is _Parameter.VAR_KEYWORD:
+            parameters.append(f'**{name}')
+            arguments.append(f'**{name}')
+        elif kind is _Parameter.KEYWORD_ONLY:
+            if previous_kind not in (_Parameter.KEYWORD_ONLY,
+                                     _Parameter.VAR_POSITIONAL):
+                parameters.append('*')
+            parameters.append(name)
+            arguments.append(f'{name} = {name}')
+        else:
+            parameters.append(name)
+            arguments.append(name)
+        previous_kind = kind
+    if previous_kind is _Parameter.POSITIONAL_ONLY:
+        parameters.append('/')
+    return names, ', '.join(parameters), ', '.join(arguments)
+# ----------------------------------------------------------------------
+def _fail(obj: _DataclassWrapped) -> None:
+    '''Slow path for building the error message'''
+    _validate_fields(obj)
+    raise TypeError(f'{obj.__class__.__qualname__} '
+                    'parameters not matching types')
+# ======================================================================
+# SWITCHING
+@_dataclass_std
+class _Validated:
+    '''Original and generated methods of a validated class'''
+    method_name: str
+    original: _Callable
+    validating: _Callable
+    sampling: _Callable
+    deferring: _Callable
+    is_valid: _Callable[[_Any], bool]
+    namespace: dict[str, _Any]
+    # Installed setting: enabled, first and deferred
+    mode: tuple[bool, int | None, bool] = (True, None, False)
+# ----------------------------------------------------------------------
+_validated: dict[type, _Validated] = {}
+_is_enabled = True
+_n_first: int | None = None
+_is_deferred = False
+# ----------------------------------------------------------------------
+def _make_sampler(cls: type, validated: _Validated, n: int
+                  ) -> _Callable[[], None]:
+    '''Makes function that restores the original method
+    after being called n times'''
+    def sample() -> None:
+        nonlocal n
+        n -= 1
+        if n <= 0:
+            setattr(cls, validated.method_name, validated.original)
+    return sample
+# ----------------------------------------------------------------------
+def _install(cls: type, validated: _Validated,
+             enabled: bool, first: int | None, deferred: bool) -> None:
+    validated.mode = (enabled, first, deferred)
+    if not enabled or first == 0:
+        method = validated.original
+    elif deferred:
+        method = validated.deferring
+    elif first is None:
+        method = validated.validating
     else:
-        method_name = '__init__'
-        original_method = getattr(cls, method_name)
-        @wraps(original_method)
-        def validation_wrap(self, *args, **kwargs) -> None:
-            original_method(self, *args, **kwargs)
-            _validate_fields(self)
+        validated.namespace['_sample'] = _make_sampler(cls, validated, first)
+        method = validated.sampling
+    setattr(cls, validated.method_name, method)
+# ----------------------------------------------------------------------
+def set_validation(enabled: bool = True,
+                   *classes: type,
+                   first: int | None = None,
+                   deferred: bool = False) -> None:
+    '''Switches validation of dataclasses on or off
+
+    When validation is off, the original dataclass methods are restored
+
+    Parameters
+    ----------
+    enabled : bool, default True
+        Whether validation is on
+    *classes : type
+        Validated dataclasses to which the setting is applied.
+        If none are given, setting is applied to all validated dataclasses
+        and to the ones created later
+    first : int | None, default None
+        If set, only this many first objects of each class are validated
+        and after that original method is restored
+    deferred : bool, default False
+        If True, objects are only recorded as pending on creation
+        and validated later in batches with `validate_pending`
+        or `validate_tree`
+
+    Raises
+    ------
+    ValueError
+        If first is negative or used with deferred,
+        or a class is not a validated dataclass
+    '''
+    global _is_enabled, _n_first, _is_deferred
+    if first is not None and first < 0:
+        raise ValueError(f'first must be non-negative, not {first}')
+    if first is not None and deferred:
+        raise ValueError('first cannot be used with deferred validation')
+    if not classes:
+        _is_enabled, _n_first, _is_deferred = enabled, first, deferred
+        classes = tuple(_validated)
+    for cls in classes:
+        try:
+            validated = _validated[cls]
+        except KeyError:
+            raise ValueError(f"'{cls.__qualname__}' "
+                             'is not a validated dataclass') from None
+        _install(cls, validated, enabled, first, deferred)
+# ======================================================================
+# DEFERRED VALIDATION
+class _PendingRef(_ref):
+    '''Weak reference to object pending validation
+
+    Object that is collected before validation is dropped from pending,
+    since it cannot be used anymore'''
+    __slots__ = ('key', 'cls')
+    key: int # Id of the object
+    cls: type # Validated class the object is checked as
+# ----------------------------------------------------------------------
+_pending: dict[int, _PendingRef] = {} # By object id
+# ----------------------------------------------------------------------
+def _forget(reference: _PendingRef) -> None:
+    if _pending.get(reference.key) is reference:
+        del _pending[reference.key]
+# ----------------------------------------------------------------------
+def _defer(cls: type, obj: _Any) -> None:
+    '''Records object as pending validation as validated class cls'''
+    try:
+        reference = _PendingRef(obj, _forget)
+    except TypeError: # Not weakly referable, e.g. slots on Python 3.10
+        _validate_batch(cls, (obj,))
+        return
+    reference.key = id(obj)
+    reference.cls = cls
+    _pending[reference.key] = reference
+# ----------------------------------------------------------------------
+def _validate_batch(cls: type, objs: _Iterable[_Any]) -> None:
+    '''Validates objects of the same class in a tight loop
+
+    Each is dropped from pending when validated, so objects after
+    an invalid one are left pending'''
+    is_valid_obj = _validated[cls].is_valid
+    pop = _pending.pop
+    for obj in objs:
+        pop(id(obj), None)
+        if not is_valid_obj(obj):
+            try:
+                _fail(obj)
+            except TypeError as error:
+                raise TypeError(f'Deferred validation of {cls.__qualname__}'
+                                f' object at {id(obj):#x} failed\n{error}'
+                                ) from None
+# ----------------------------------------------------------------------
+def validate_pending() -> None:
+    '''Validates all objects pending from deferred validation
+
+    Raises
+    ------
+    TypeError
+        If an object is invalid. Objects not yet validated are left
+        pending
+    '''
+    batches: dict[type, list[_Any]] = _defaultdict(list)
+    for reference in list(_pending.values()):
+        if (obj := reference()) is not None:
+            batches[reference.cls].append(obj)
+    for cls, batch in batches.items():
+        _validate_batch(cls, batch)
+# ----------------------------------------------------------------------
+def _reachable_pending(root: _Any) -> dict[type, list[_Any]]:
+    '''Pending objects reachable from root via dataclass fields
+    and builtin containers, grouped by class'''
+    batches: dict[type, list[_Any]] = _defaultdict(list)
+    reached: set[int] = set()
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        if (obj_id := id(obj)) in reached or isinstance(obj, (str, bytes)):
+            continue
+        if isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif is_dataclass(obj) and not isinstance(obj, type):
+            if (reference := _pending.get(obj_id)) is not None:
+                batches[reference.cls].append(obj)
+            stack.extend(value for name in obj.__dataclass_fields__
+                         if (value := getattr(obj, name, MISSING))
+                         is not MISSING)
+        else:
+            continue
+        reached.add(obj_id)
+    return batches
+# ----------------------------------------------------------------------
+def validate_tree(root: _Any) -> None:
+    '''Validates pending objects reachable from the root object,
+    grouped by class
+
+    Cost is in proportion to the size of the tree, not to the number
+    of pending objects.
+
+    Raises
+    ------
+    TypeError
+        If an object is invalid
+    '''
+    if not _pending:
+        return
+    for cls, batch in _reachable_pending(root).items():
+        _validate_batch(cls, batch)
+# ----------------------------------------------------------------------
+def _generate(cls: type, method_name: str, original_method: _Callable
+              ) -> _Validated | None:
+    '''Generates validating methods for the class'''
+    #─────────────────────────────────────────────────────────────────────────
+    # Generating a new method to wrap the original dataclass init or
+    # post_init. The generated method has the same signature as
+    # the original and the field checks are inlined to it
+    is_post_init = method_name == '__post_init__'
+    names, parameters, arguments = _mirror_signature(original_method)
+    selfname = names[0]
+    # In post init the fields are read from the object
+    condition, namespace = _compile_condition(
+        cls, selfname, set() if is_post_init else set(names[1:]))
+    if not condition: # Nothing to validate
+        return None
+    condition_attributes, _ = _compile_condition(cls, selfname, set())
+
+    call = f'    _original({arguments})\n'
+    check = (f'    if not ({condition}):\n'
+             f'        _fail({selfname})\n')
+    defer = f'    _defer({selfname})\n'
+    body = check + call if is_post_init else call + check
+    source = (f'def _validating({parameters}):\n{body}'
+              f'def _sampling({parameters}):\n    _sample()\n{body}'
+              f'def _deferring({parameters}):\n'
+              f'{defer + call if is_post_init else call + defer}'
+              f'def _is_valid({selfname}):\n'
+              f'    return {condition_attributes}\n')
+    namespace.update(_original = original_method,
+                     _fail = _fail,
+                     _defer = _partial(_defer, cls))
+    exec(source, namespace) # pylint: disable=exec-used
     # ------------------------------------------------------------------
-    setattr(cls, method_name, validation_wrap)
+    for name in ('_validating', '_sampling', '_deferring'):
+        method = namespace[name]
+        method.__defaults__ = original_method.__defaults__
+        method.__kwdefaults__ = original_method.__kwdefaults__
+        wraps(original_method)(method)
+    return _Validated(method_name, original_method,
+                      namespace['_validating'], namespace['_sampling'],
+                      namespace['_deferring'], namespace['_is_valid'],
+                      namespace)
+# ----------------------------------------------------------------------
+def set_validation_policy(threshold: int | None = None,
+                          size: int = 8,
+                          depth: int | None = None) -> None:
+    '''Sets how much of the contents of collections is validated.
+    Validators of all validated dataclasses are regenerated
+
+    Parameters
+    ----------
+    threshold : int | None, default None
+        Collections longer than this are validated only from a sample
+        of first, last and random items. If None, all items are validated
+    size : int, default 8
+        Number of items in each of the first, last and random samples
+    depth : int | None, default None
+        Maximum number of nested levels of generic types validated,
+        e.g. with 1 items of list[list[int]] are validated only to be lists.
+        If None, all levels are validated
+
+    Raises
+    ------
+    ValueError
+        If any of the parameters is negative
+    '''
+    global _sample_threshold, _sample_size, _max_depth
+    if ((threshold is not None and threshold < 0)
+        or size < 0
+        or (depth is not None and depth < 0)):
+        raise ValueError('Validation policy parameters must be non-negative')
+    _sample_threshold, _sample_size, _max_depth = threshold, size, depth
+    _predicate.cache_clear()
+    for cls, validated in list(_validated.items()):
+        regenerated = _generate(cls, validated.method_name, validated.original)
+        if regenerated is None: # Nothing left to validate
+            setattr(cls, validated.method_name, validated.original)
+            del _validated[cls]
+            continue
+        _validated[cls] = regenerated
+        _install(cls, regenerated, *validated.mode)
+# ----------------------------------------------------------------------
+def _original(cls: type, method_name: str) -> _Callable:
+    '''Method of the class without validation of a validated base class
+    it may be inherited from'''
+    base = next(base for base in cls.__mro__ if method_name in vars(base))
+    if ((validated := _validated.get(base)) is not None
+        and validated.method_name == method_name):
+        return validated.original
+    return vars(base)[method_name]
+# ----------------------------------------------------------------------
+def validate(cls: type):
+    '''Validate after 'init', 'post_init' or not at all (`None`)
+    '''
+    method_name = ('__post_init__' if hasattr(cls, '__post_init__')
+                   else '__init__')
+    if (validated := _generate(cls, method_name,
+                               _original(cls, method_name))) is None:
+        return cls
+    _validated[cls] = validated
+    _install(cls, validated, _is_enabled, _n_first, _is_deferred)
     return cls
 _validation_function = validate
 # ----------------------------------------------------------------------
@@ -133,6 +654,9 @@ def dataclass(cls = None, /, *, validate: bool = False, **kwargs # type: ignore
     '''
     if not validate:
         return _dataclass_std(cls, **kwargs)
+    if kwargs.get('slots') and _version_info >= (3, 11):
+        # Deferred validation refers to pending objects weakly
+        kwargs.setdefault('weakref_slot', True)
     # cls is None
     dataclass_wrapper = _dataclass_std(cls, **kwargs)
 
@@ -6,6 +6,20 @@ from yamdog import _API
 def test_RAW_INDENT_is_4_spaces():
     assert _API._RAW_INDENT == ' '*4
 # ======================================================================
+# _validation_first
+@pytest.mark.parametrize('value, is_deferred, expected', [('', False, None),
+                                                          (' 5 ', False, 5),
+                                                          ('0', False, 0)])
+def test_validation_first(value, is_deferred, expected):
+    assert _API._validation_first(value, is_deferred) == expected
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize('value, is_deferred', [('abc', False),
+                                                ('-1', False),
+                                                ('5', True)])
+def test_validation_first_invalid_warns(value, is_deferred):
+    with pytest.warns(RuntimeWarning, match = 'YAMDOG_VALIDATION_FIRST'):
+        assert _API._validation_first(value, is_deferred) is None
+# ======================================================================
 # _sanitise_str
 @pytest.mark.parametrize("string, expected", [
     ('test', 'test'),
@@ -17,25 +31,21 @@ def test_RAW_INDENT_is_4_spaces():
 def test_string_sanitisation(string, expected):
     assert _API._sanitise_str(string) == expected
 # ======================================================================
-class Test_collect_iter:
-    def test_collect_iter_single(self):
-        ref = md.Link('target', 'content', 'title')
+class Test_walk:
+    def test_walk_order(self):
         footnote = md.Footnote('footnote')
-        visited, output = _API._collect_iter([ref, footnote],
-                                             set(),
-                                             _API._empty_collected())
-        links, footnotes = output
-        assert visited == {id(ref), id(footnote)}
-        assert dict(links) == {('target', 'title'): [ref]}
-        assert dict(footnotes) == {str(footnote.content): [footnote]}
+        text = md.Text('text', {md.BOLD})
+        paragraph = md.Paragraph([text, footnote, text])
+        assert list(_API._walk([paragraph, 'str', footnote], set())) == [
+            paragraph, text, footnote]
     #─────────────────────────────────────────────────────────────────────────
-    def test_collect_iter_multiple(self):
+    def test_walk_collectables(self):
         ref1 = md.Link('target', 'content', 'title')
         ref2 = md.Link('target', 'content', 'title')
         ref3 = md.Link('target3', 'content3', 'title3')
         footnote1 = md.Footnote('footnote1')
         footnote2 = md.Footnote('footnote2')
-        visited, output = _API._collect_iter([
+        document = md.Document([
             'test-no-collect',
             md.Text('test-no-collect1', {md.BOLD}),
             md.Text(ref3, {md.ITALIC}),
@@ -46,16 +56,22 @@ class Test_collect_iter:
                         ref1]),
             md.QuoteBlock(footnote1),
             md.Table([['a', footnote2]], [1,2]),
-        ], set(), _API._empty_collected())
-        links, footnotes = output
-        expected_ln = {('target', 'title'): [ref1, ref2],
-                       ('target3', 'title3'): [ref3]}
-        print(dict(links))
-        print(expected_ln)
-        assert dict(links) == expected_ln
-        expected_fn = {str(footnote1.content): [footnote1],
-                       str(footnote2.content): [footnote2]}
-        assert dict(footnotes) == expected_fn
+        ])
+        elements = list(document.walk())
+        assert [element for element in elements
+                if isinstance(element, md.Link) and element.title
+                ] == [ref3, ref1, ref2]
+        assert [element for element in elements
+                if isinstance(element, md.Footnote)] == [footnote1, footnote2]
+    #─────────────────────────────────────────────────────────────────────────
+    def test_walk_deep_nesting(self):
+        footnote = md.Footnote('footnote')
+        item = footnote
+        for _ in range(10_000):
+            item = md.Quote(item)
+        elements = list(_API._walk((item,), set()))
+        assert len(elements) == 10_001
+        assert elements[-1] is footnote
 # ======================================================================
 # Header
 @pytest.mark.parametrize("args,expected", [
@@ -3,8 +3,14 @@ from collections import abc
 from typing import Any
 
 import pytest
+from yamdog import dataclass_validate
 from yamdog.dataclass_validate import dataclass
 from yamdog.dataclass_validate import field
+from yamdog.dataclass_validate import is_valid
+from yamdog.dataclass_validate import set_validation
+from yamdog.dataclass_validate import set_validation_policy
+from yamdog.dataclass_validate import validate_pending
+from yamdog.dataclass_validate import validate_tree
 # ======================================================================
 def _check(cls: type, correct_args: list[Any], index: int, value: Any):
     args = correct_args.copy()
@@ -102,3 +108,202 @@ def test_type_validation_tuple_valid():
                                                      (1, (1, '2')))))
 def test_type_validation_tuple_invalid(index, value):
     _check(TupleClass, tuple_args, index, value)
+# ======================================================================
+# _compile
+any_args = [[1, '2'], (1, '2'), {1: '2'}]
+
+@dataclass(validate = True)
+class AnyClass:
+    any1: list[Any]
+    any2: tuple[Any, ...]
+    any3: dict[int, Any]
+    any4: Any = None
+# ----------------------------------------------------------------------
+def test_type_validation_any_valid():
+    AnyClass(*any_args)
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize("index,value", enumerate(((1,), [1], {'1': 2})))
+def test_type_validation_any_invalid(index, value):
+    _check(AnyClass, any_args, index, value)
+# ----------------------------------------------------------------------
+def test_compile_any_list_does_not_iterate():
+    class NotIterable(list):
+        def __iter__(self):
+            raise AssertionError('iterated')
+    AnyClass(NotIterable(), *any_args[1:])
+# ======================================================================
+# Generated method
+@dataclass(validate = True)
+class PostInitClass:
+    value: int
+    factory: list[int] = field(default_factory = list)
+    keyword: str = field(default = '', kw_only = True)
+    def __post_init__(self):
+        self.value += 1
+# ----------------------------------------------------------------------
+def test_post_init_validated_before_post_init():
+    with pytest.raises(TypeError, match = 'value'):
+        PostInitClass('1')
+# ----------------------------------------------------------------------
+def test_generated_method_keeps_signature_defaults():
+    obj = PostInitClass(1, keyword = 'a')
+    assert (obj.value, obj.factory, obj.keyword) == (2, [], 'a')
+# ----------------------------------------------------------------------
+def test_generated_method_validates_factory_and_keyword():
+    with pytest.raises(TypeError, match = 'keyword'):
+        PostInitClass(1, keyword = 1)
+    with pytest.raises(TypeError, match = 'factory'):
+        PostInitClass(1, ['1'])
+# ======================================================================
+# set_validation
+@dataclass(validate = True)
+class SwitchedClass:
+    value: int
+# ----------------------------------------------------------------------
+@pytest.fixture
+def switched():
+    original = SwitchedClass.__init__.__wrapped__
+    yield original
+    set_validation(True)
+# ----------------------------------------------------------------------
+def test_set_validation_off_restores_original(switched):
+    set_validation(False)
+    assert SwitchedClass.__init__ is switched
+    SwitchedClass('1')
+    set_validation(True)
+    assert SwitchedClass.__init__ is not switched
+    with pytest.raises(TypeError):
+        SwitchedClass('1')
+# ----------------------------------------------------------------------
+def test_set_validation_per_class(switched):
+    set_validation(False, SwitchedClass)
+    SwitchedClass('1')
+    with pytest.raises(TypeError):
+        IterateClass(1, [], set())
+# ----------------------------------------------------------------------
+def test_set_validation_first(switched):
+    set_validation(True, SwitchedClass, first = 2)
+    with pytest.raises(TypeError):
+        SwitchedClass('1')
+    SwitchedClass(1)
+    assert SwitchedClass.__init__ is switched
+    SwitchedClass('1')
+# ----------------------------------------------------------------------
+@dataclass(validate = True)
+class SwitchedPostInitClass:
+    value: int
+    def __post_init__(self):
+        pass
+# ----------------------------------------------------------------------
+@dataclass(validate = True)
+class SwitchedSubclass(SwitchedPostInitClass):
+    other: str = ''
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize('classes', ((), (SwitchedSubclass,)))
+def test_set_validation_off_inherited_post_init(switched, classes):
+    set_validation(False, *classes)
+    SwitchedSubclass('1')
+    set_validation(True, *classes)
+    with pytest.raises(TypeError):
+        SwitchedSubclass('1')
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize('args, kwargs', (((True, int), {}),
+                                          ((True,), {'first': -1})))
+def test_set_validation_invalid_raises_ValueError(args, kwargs):
+    with pytest.raises(ValueError):
+        set_validation(*args, **kwargs)
+# ======================================================================
+# is_valid
+@pytest.mark.parametrize('fieldtype, value, expected', (
+    (int, 1, True),
+    (int, '1', False),
+    (int | None, None, True),
+    (list[int], [1, '2'], False),
+    (dict[int, list[int]], {1: [2]}, True),
+    (tuple[int, str], (1, 2), False),
+    (Any, object(), True)))
+def test_is_valid(fieldtype, value, expected):
+    assert is_valid(fieldtype, value) is expected
+# ======================================================================
+# Error messages
+def test_error_message_bounded():
+    content = [1] * 10_000 + ['a' * 1000]
+    with pytest.raises(TypeError) as excinfo:
+        IterateClass([], content, set())
+    message = str(excinfo.value)
+    assert 'item 10000' in message
+    assert len(message) < 200
+# ======================================================================
+# Deferred validation
+@dataclass(validate = True)
+class TreeClass:
+    value: int
+    children: list = field(default_factory = list)
+# ----------------------------------------------------------------------
+@pytest.fixture
+def deferred():
+    set_validation(deferred = True)
+    yield
+    set_validation(True)
+    validate_pending()
+# ----------------------------------------------------------------------
+def test_deferred_validate_tree(deferred):
+    invalid = TreeClass('1')
+    valid = TreeClass(1, [invalid])
+    outside = TreeClass('1')
+    with pytest.raises(TypeError, match = 'value'):
+        validate_tree(valid)
+    validate_tree(valid) # Already validated
+    with pytest.raises(TypeError):
+        validate_pending()
+    validate_pending()
+# ----------------------------------------------------------------------
+def test_deferred_failure_keeps_rest_pending(deferred):
+    invalid = [TreeClass('1'), TreeClass('2')]
+    for _ in invalid:
+        with pytest.raises(TypeError):
+            validate_pending()
+    validate_pending()
+# ----------------------------------------------------------------------
+def test_deferred_discarded_not_kept(deferred):
+    for _ in range(1000):
+        TreeClass('1') # Invalid, but never used
+    assert not dataclass_validate._pending
+    validate_pending()
+# ----------------------------------------------------------------------
+def test_deferred_first_raises_ValueError():
+    with pytest.raises(ValueError):
+        set_validation(first = 1, deferred = True)
+# ======================================================================
+# set_validation_policy
+@pytest.fixture
+def policy():
+    yield
+    set_validation_policy()
+# ----------------------------------------------------------------------
+def test_policy_sampled_skips_middle(policy):
+    set_validation_policy(threshold = 100, size = 2)
+    content = [1] * 1000
+    content[500] = '1' # Outside the sample
+    IterateClass([], content, set())
+    content[-1] = '1'
+    with pytest.raises(TypeError, match = 'sample of 6 from 1000 items'):
+        IterateClass([], content, set())
+# ----------------------------------------------------------------------
+def test_policy_under_threshold_full(policy):
+    set_validation_policy(threshold = 100, size = 2)
+    content = [1] * 100
+    content[50] = '1'
+    with pytest.raises(TypeError):
+        IterateClass([], content, set())
+# ----------------------------------------------------------------------
+def test_policy_depth(policy):
+    set_validation_policy(depth = 1)
+    DictClass({}, {1: 1}, {1: {1: '2'}})
+    with pytest.raises(TypeError):
+        DictClass({}, {1: '1'}, {})
+    assert is_valid(dict[int, dict[int, int]], {1: {1: '2'}})
+# ----------------------------------------------------------------------
+def test_policy_negative_raises_ValueError():
+    with pytest.raises(ValueError):
+        set_validation_policy(size = -1)
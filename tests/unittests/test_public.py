@@ -1,7 +1,16 @@
 '''Unittests for public interface of the package.
 Classes are sorted alphabetically and related functions'''
+import bz2
+import csv
+import gzip
+import io
 import itertools
+import json
+import lzma
 import pathlib
+import pickle
+import sqlite3
+import threading
 from pprint import pprint
 
 import pytest
@@ -171,6 +180,27 @@ class Test_Document:
                                                 '\n'
                                                 '[1]: <target> "title"')
     # ------------------------------------------------------------------
+    def test_nested_footnotes_numbered_in_order_and_rerender(self):
+        inner = md.Footnote('inner')
+        document = md.Document([md.Footnote(md.Paragraph(['outer', inner])),
+                                md.Footnote('last'),
+                                md.Footnote(md.Link('target', 'content',
+                                                    'title'))])
+        expected = ('[^1]\n'
+                    '\n'
+                    '[^3]\n'
+                    '\n'
+                    '[^4]\n'
+                    '\n'
+                    '[^1]: outer[^2]\n'
+                    '[^2]: inner\n'
+                    '[^3]: last\n'
+                    '[^4]: [content](target)\n'
+                    '\n'
+                    '[1]: <target> "title"')
+        assert str(document) == expected
+        assert str(document) == expected
+    # ------------------------------------------------------------------
     # Not supported by markdown viewers
     # def test_footnote_in_paragraph_in_reference(self):
     #     paragraph = md.Paragraph(['text', self.footnote])
@@ -222,6 +252,322 @@ class Test_Document:
         document2 = md.Document(['case'])
         document1 += document2
         assert document1 == md.Document(['test', 'case'])
+    # ------------------------------------------------------------------
+    def test_render_into_list_writer(self):
+        document = md.Document([md.Heading('test', 1),
+                                md.Listing(['a\nb', md.Quote('c\nd')])])
+        fragments: list[str] = []
+        class Writer:
+            write = fragments.append
+        document.render_into(Writer())
+        assert len(fragments) > 1
+        assert ''.join(fragments) == str(document) == ('# test\n'
+                                                        '\n'
+                                                        '- a\n'
+                                                        '  b\n'
+                                                        '- > c\n'
+                                                        '  > d')
+    # ------------------------------------------------------------------
+    def test_walk_preorder_once(self):
+        link = md.Link('target', 'link')
+        footnote = md.Footnote(md.Text(link))
+        paragraph = md.Paragraph(['a', footnote, footnote])
+        section = md.Section('title', [paragraph])
+        document = md.Document([section, md.Table([[link]], ['a'])])
+        table = document.content[1]
+        assert list(document.walk()) == [section._heading, paragraph, footnote,
+                                         footnote.content, link, table]
+    # ------------------------------------------------------------------
+    def test_rerender_after_changes(self):
+        text = md.Text('text')
+        table = md.Table([[1, 2]], ['a', 'b'])
+        document = md.Document([md.Paragraph([text, md.Footnote('first')]),
+                                table])
+        str(document)
+        text.bold()
+        table.content[0][1] = 3
+        table.invalidate()
+        document.content.insert(0, md.Paragraph([md.Footnote('new')]))
+        expected = md.Document([md.Paragraph([md.Footnote('new')]),
+                                md.Paragraph([md.Text('text', {md.BOLD}),
+                                              md.Footnote('first')]),
+                                md.Table([[1, 3]], ['a', 'b'])])
+        assert str(document) == str(expected)
+        assert str(document).endswith('[^1]: new\n[^2]: first')
+    # ------------------------------------------------------------------
+    @pytest.fixture
+    def render_caching(self):
+        md.set_render_caching(True)
+        yield
+        md.set_render_caching(False)
+    # ------------------------------------------------------------------
+    def test_render_caching_off_keeps_nothing(self):
+        table = md.Table([[1, 2]], ['a', 'b'])
+        str(md.Document([table]))
+        assert table._rendered is None
+    # ------------------------------------------------------------------
+    def test_rerender_after_changes_without_invalidate(self, render_caching):
+        heading = md.Heading('a', 1)
+        paragraph = md.Paragraph(['x'])
+        listing = md.Listing(['one'])
+        text = md.Text('t')
+        table = md.Table([[1, 2], [md.Text('c'), 4]], ['a', 'b'])
+        document = md.Document([heading, paragraph, listing,
+                                md.Paragraph([text]), table])
+        str(document)
+        heading.content = 'b' # Field assignment
+        paragraph.content.append('y') # In place
+        listing.append('two') # Delegated to content
+        text.content = 'u'
+        table.content[0][1] = 3
+        table.content[1][0].content = 'd' # Element in cell
+        expected = md.Document([md.Heading('b', 1), md.Paragraph(['x', 'y']),
+                                md.Listing(['one', 'two']),
+                                md.Paragraph([md.Text('u')]),
+                                md.Table([[1, 3], ['d', 4]], ['a', 'b'])])
+        assert str(document) == str(expected)
+    # ------------------------------------------------------------------
+    def test_rerender_after_custom_object_changes(self, render_caching):
+        class Custom:
+            value = 1
+            def __str__(self) -> str:
+                return f'C{self.value}'
+        custom = Custom()
+        document = md.Document([md.Quote(custom)])
+        assert str(document) == '> C1'
+        custom.value = 2
+        assert str(document) == '> C2'
+    # ------------------------------------------------------------------
+    def test_extended_table_cell_change_without_invalidate(self,
+                                                           render_caching):
+        table = md.Table([], ['a']).extend([[1], [2]])
+        document = md.Document([table])
+        str(document)
+        table.extend([[3]])
+        table.content[0][0] = 'x'
+        assert str(document) == str(md.Table([['x'], [2], [3]], ['a']))
+    # ------------------------------------------------------------------
+    def test_kept_element_values_not_copied_to_containing(self,
+                                                           render_caching):
+        listing = md.Listing([md.Table([[1, 2]], ['a', 'b']),
+                              md.Paragraph(['x'])])
+        document = md.Document([listing])
+        str(document)
+        document.content.append('new')
+        str(document)
+        assert [type(entry) for entry in listing._rendered[3][1:]
+                ] == [_API._Kept, _API._Kept]
+    def test_to_file(self, tmp_path):
+        document = md.Document(['test', md.Footnote('note')])
+        path = tmp_path / 'test.md'
+        assert document.to_file(path)
+        assert path.read_text() == str(document) + '\n'
+    # ------------------------------------------------------------------
+    @pytest.mark.parametrize('existing', ['test\n\ncase\n',
+                                          'test\n\ncase',
+                                          'test\n\ncase\nmore',
+                                          'test\n\nother\n',
+                                          ''])
+    def test_to_file_skip_unchanged(self, tmp_path, existing):
+        path = tmp_path / 'test.md'
+        path.write_text(existing)
+        mtime = path.stat().st_mtime_ns
+        is_written = md.Document(['test', 'case']).to_file(path)
+        assert path.read_text() == 'test\n\ncase\n'
+        assert is_written == (existing != 'test\n\ncase\n')
+        if not is_written:
+            assert path.stat().st_mtime_ns == mtime
+        assert [item.name for item in tmp_path.iterdir()] == ['test.md']
+    # ------------------------------------------------------------------
+    @pytest.mark.parametrize('name, compression, module',
+                             [('test.md.gz', 'infer', gzip),
+                              ('test.md.bz2', 'infer', bz2),
+                              ('test.md.xz', 'infer', lzma),
+                              ('test.md', 'gzip', gzip)])
+    def test_to_file_compressed(self, tmp_path, name, compression, module):
+        document = md.Document(['test', md.Table([[1, 2]], ['a', 'b'])])
+        path = tmp_path / name
+        path.write_bytes(b'not compressed')
+        assert document.to_file(path, compression)
+        assert module.open(path, 'rt').read() == str(document) + '\n'
+        data = path.read_bytes()
+        assert not document.to_file(path, compression)
+        assert path.read_bytes() == data
+    # ------------------------------------------------------------------
+    def test_to_file_invalid_compression(self, tmp_path):
+        with pytest.raises(ValueError):
+            md.Document(['test']).to_file(tmp_path / 'test.md', 'zip')
+    # ------------------------------------------------------------------
+    def test_to_file_failure_keeps_file(self, tmp_path):
+        class Failing(md.Element):
+            def __str__(self):
+                raise RuntimeError('failing')
+        path = tmp_path / 'test.md'
+        path.write_text('old')
+        with pytest.raises(RuntimeError):
+            md.Document(['old and new', Failing()]).to_file(path)
+        assert path.read_text() == 'old'
+        assert [item.name for item in tmp_path.iterdir()] == ['test.md']
+# ======================================================================
+class Test_StreamDocument:
+    content = [md.TOC(),
+               md.Heading('test', 1),
+               'text\n',
+               md.Paragraph([md.Footnote('note'),
+                             md.Link('target', 'link', 'title')]),
+               md.Heading('case', 2),
+               md.Footnote('note'),
+               md.Footnote(md.Link('other', 'link', 'title'))]
+    # ------------------------------------------------------------------
+    def test_str_as_Document(self):
+        document = md.Document(self.content, ('yaml', 'test'))
+        stream = md.StreamDocument(iter(self.content), ('yaml', 'test'))
+        assert str(stream) == str(document)
+    # ------------------------------------------------------------------
+    def test_generator_to_file(self, tmp_path):
+        path = tmp_path / 'test.md'
+        assert md.StreamDocument(md.Paragraph([str(index),
+                                               md.Footnote('note')])
+                                 for index in range(1000)).to_file(path)
+        text = path.read_text()
+        assert text.endswith('999[^1]\n\n[^1]: note\n')
+    # ------------------------------------------------------------------
+    def test_threads_number_separately(self):
+        turns = [threading.Event(), threading.Event()]
+        def items(turn: int, notes: str):
+            for note in notes: # Renders alternate between the threads
+                turns[turn].wait()
+                turns[turn].clear()
+                yield md.Paragraph([md.Footnote(note)])
+                turns[1 - turn].set()
+        texts = {}
+        def render(turn: int, notes: str):
+            texts[turn] = str(md.StreamDocument(items(turn, notes)))
+        threads = [threading.Thread(target = render, args = args)
+                   for args in ((0, 'abc'), (1, 'cde'))]
+        for thread in threads:
+            thread.start()
+        turns[0].set()
+        for thread in threads:
+            thread.join(10)
+        assert texts == {turn: str(md.Document(list(items)))
+                         for turn, items in enumerate(
+                             [[md.Paragraph([md.Footnote(note)])
+                               for note in notes] for notes in ('abc', 'cde')])}
+# ======================================================================
+class Test_RenderCache:
+    @staticmethod
+    def make_document(cell = 'cell') -> md.Document:
+        return md.Document([md.Table([[cell, 1]], ['a', 'b']),
+                            md.Table([[md.Footnote('note')]], ['a'])])
+    # ------------------------------------------------------------------
+    def test_reuse_between_documents(self, tmp_path):
+        expected = str(self.make_document())
+        try:
+            cache = md.set_render_cache(tmp_path / 'cache.sqlite')
+            # Table with footnote is not stored
+            assert str(self.make_document()) == expected
+            assert (cache.hits, cache.misses) == (0, 2)
+            assert str(self.make_document()) == expected
+            assert (cache.hits, cache.misses) == (1, 3)
+            str(self.make_document('other'))
+            assert (cache.hits, cache.misses) == (1, 5)
+            cache.close()
+            cache = md.set_render_cache(tmp_path / 'cache.sqlite')
+            assert str(self.make_document()) == expected
+            assert (cache.hits, cache.misses) == (1, 1)
+        finally:
+            md.set_render_cache(None)
+            cache.close()
+    # ------------------------------------------------------------------
+    def test_unstable_digest_not_stored(self, tmp_path):
+        def rows(key: str):
+            yield [key, 1]
+        try:
+            cache = md.set_render_cache(tmp_path / 'cache.sqlite')
+            for key in 'ABCDEF':
+                text = str(md.Document([md.Table(rows(key), ['k', 'i'])]))
+                assert text == str(md.Table([[key, 1]], ['k', 'i']))
+            assert cache.hits == 0
+            assert md.Table(rows('A'), ['k', 'i']).digest() is None
+            assert md.Table([[object()]], ['a']).digest() is None
+        finally:
+            md.set_render_cache(None)
+            cache.close()
+    # ------------------------------------------------------------------
+    def test_hit_does_not_lock_file(self, tmp_path):
+        path = tmp_path / 'cache.sqlite'
+        with md.RenderCache(path) as cache:
+            cache.put('a', 'text')
+            assert cache.get('a') == 'text'
+            other = sqlite3.connect(path, timeout = 0)
+            assert other.execute('PRAGMA journal_mode').fetchone() == ('wal',)
+            with other: # Raises if the file is locked
+                other.execute("DELETE FROM renders WHERE digest = 'b'")
+            other.close()
+    # ------------------------------------------------------------------
+    def test_eviction(self, tmp_path):
+        with md.RenderCache(tmp_path / 'cache.sqlite', max_size = 10) as cache:
+            cache.put('a', '12345')
+            cache.put('b', '12345')
+            cache.put('c', '12345')
+            assert cache.get('a') is None
+            assert cache.get('c') == '12345'
+    # ------------------------------------------------------------------
+    def test_digest(self):
+        text = md.Text('text', {md.BOLD, md.ITALIC})
+        digest = md.Paragraph([text]).digest()
+        assert digest == md.Paragraph([md.Text('text', {md.ITALIC, md.BOLD})]
+                                      ).digest()
+        assert digest != md.Paragraph([md.Text('text', {md.BOLD})]).digest()
+    # ------------------------------------------------------------------
+    def test_digest_same_after_render(self):
+        document = md.Document([md.TOC(), md.Heading('a', 1),
+                                md.Paragraph([md.Footnote('note'),
+                                              md.Link('url', 'link', 'title')])])
+        digest = document.digest()
+        str(document)
+        assert document.digest() == digest
+# ======================================================================
+class Test_set_validation:
+    def test_off_and_on(self):
+        try:
+            md.set_validation(False)
+            md.Text('test', 'style') # type: ignore
+        finally:
+            md.set_validation(True)
+        with pytest.raises(TypeError):
+            md.Text('test', 'style') # type: ignore
+    # ------------------------------------------------------------------
+    def test_deferred_validated_on_str(self):
+        try:
+            md.set_validation(deferred = True)
+            document = md.Document([md.Paragraph([md.Text('test', 'style')])])
+        finally:
+            md.set_validation(True)
+        with pytest.raises(TypeError, match = 'Text'):
+            str(document)
+    # ------------------------------------------------------------------
+    def test_deferred_validated_in_stream(self):
+        try:
+            md.set_validation(deferred = True)
+            items = (md.Paragraph([md.Text('test', style)])
+                     for style in (set(), 'style'))
+            document = md.StreamDocument(items)
+        finally:
+            md.set_validation(True)
+        with pytest.raises(TypeError, match = 'Text'):
+            str(document)
+    # ------------------------------------------------------------------
+    def test_validate_pending(self):
+        try:
+            md.set_validation(deferred = True)
+            text = md.Text('test', 'style') # type: ignore
+        finally:
+            md.set_validation(True)
+        with pytest.raises(TypeError, match = 'Text'):
+            md.validate_pending()
+        del text
 # ======================================================================
 # Element
 @pytest.mark.parametrize('element1, element2',
@@ -234,6 +580,24 @@ class Test_Document:
                                                  md.MathBlock('a = b^2')), 2))
 def test_Element_add(element1, element2):
     assert element1 + element2 == md.Document([element1, element2])
+# ----------------------------------------------------------------------
+def test_Element_subclass_extending_str():
+    class Exclaimed(md.Heading):
+        def __str__(self) -> str:
+            return super().__str__() + '!'
+    class Subclass(Exclaimed):
+        pass
+    assert str(Exclaimed('a', 1)) == '# a!'
+    assert str(md.Document([Subclass('a', 1), md.Quote(Subclass('b', 2))])
+               ) == '# a!\n\n> ## b!'
+# ----------------------------------------------------------------------
+def test_Element_subclass_with_only_str():
+    class Custom(md.Element):
+        def __str__(self) -> str:
+            return 'custom'
+    assert str(md.Document([Custom(), md.Quote(Custom())])) == ('custom\n'
+                                                               '\n'
+                                                               '> custom')
 # ======================================================================
 # Emoji
 def test_Emoji_str():
@@ -397,6 +761,17 @@ class Test_Paragraph:
 def test_Quote_str(args, expected):
     assert str(md.Quote(*args)) == expected
 # ======================================================================
+# Section
+def test_Section_str():
+    assert str(md.Section('title', ['text'])) == ('title\n'
+                                                  '=====\n'
+                                                  '\n'
+                                                  'text')
+# ======================================================================
+def test_Align_pickle():
+    for align in md.Align:
+        assert pickle.loads(pickle.dumps(align)) is align
+# ======================================================================
 class Test_Table:
     path_tables = PATH_BASE / 'tables'
     simple_table = ('| a   | b   |\n'
@@ -444,6 +819,231 @@ class Test_Table:
                                                        '| 2   | 2   |\n'
                                                        '|     | 3   |')
     # ------------------------------------------------------------------
+    def test_from_dict_iterators(self):
+        dictionary = {'a': iter((1, 2)), 'b': (n for n in (1, 2, 3))}
+        assert (md.Table.from_dict(dictionary)
+                == md.Table([[1, 1], [2, 2], ['', 3]], ['a', 'b']))
+    # ------------------------------------------------------------------
+    @pytest.mark.parametrize('compact', (False, True))
+    @pytest.mark.parametrize('align', (md.LEFT, md.CENTER, md.RIGHT))
+    def test_columns_as_rows(self, compact, align):
+        columns = [(1, 22, 333), ('a|b', 'c\nd'), (md.Text('x').bold(),)]
+        rows = list(map(list, md.Columns(columns)))
+        assert rows == [[1, 'a|b', md.Text('x').bold()], [22, 'c\nd', ''],
+                        [333, '', '']]
+        header = ['a', 'bbbbbb', 'c', 'd']
+        assert (str(md.Table(md.Columns(columns), header, align, compact))
+                == str(md.Table(rows, header, align, compact)))
+    # ------------------------------------------------------------------
+    def test_columns_sequence_of_rows(self):
+        table = md.Table.from_dict({'a': [1, 2, 3], 'b': ['x', 'y']})
+        rows = [[1, 'x'], [2, 'y'], [3, '']]
+        assert table == md.Table(rows, ['a', 'b'])
+        assert table.content[0] == (1, 'x')
+        assert table.content[-1] == (3, '')
+        assert table.content[1:] == rows[1:]
+        assert (3, '') in table.content
+        table.append([4, 'z', True])
+        rows = [[1, 'x', ''], [2, 'y', ''], [3, '', ''], [4, 'z', True]]
+        assert table.content == rows
+        assert str(table) == str(md.Table(rows, ['a', 'b']))
+        with pytest.raises(IndexError):
+            table.content[4]
+    # ------------------------------------------------------------------
+    def test_columns_numpy(self):
+        np = pytest.importorskip('numpy')
+        data = {'int': np.arange(-5, 5),
+                'float': np.linspace(0, 1, 10),
+                'str': np.array(['a', 'b|c'] * 5),
+                'object': np.array([md.Text('x').bold(), 1.5] * 5, dtype = object)}
+        rows = [list(row) for row in zip(*data.values())]
+        assert (str(md.Table.from_dict(data, align = md.RIGHT))
+                == str(md.Table(rows, list(data), md.RIGHT)))
+    # ------------------------------------------------------------------
+    @pytest.mark.parametrize('compact', (False, True))
+    def test_pages_rows(self, compact):
+        rows = [[n, 'x' * n] for n in range(10)]
+        table = md.Table(iter(rows), ['a', 'b'], md.RIGHT, compact)
+        pages = list(table.pages(4))
+        assert [page.content for page in pages] == [rows[:4], rows[4:8],
+                                                    rows[8:]]
+        for page in pages:
+            assert str(page) == str(md.Table(page.content, ['a', 'b'],
+                                             md.RIGHT, compact))
+        assert str(next(md.Table([], ['a']).pages(4))) == str(md.Table([],
+                                                                       ['a']))
+    # ------------------------------------------------------------------
+    @pytest.mark.parametrize('compact', (False, True))
+    @pytest.mark.parametrize('size', (1, 60, 100, 1000))
+    def test_pages_size(self, compact, size):
+        rows = [[n, 'x|' * n][:1 + n % 2] for n in range(20)]
+        table = md.Table(rows, ['a'], compact = compact)
+        pages = list(table.pages(size = size))
+        assert [row for page in pages for row in page.content] == rows
+        for page, following in zip(pages, pages[1:]):
+            assert len(str(page)) <= size or len(page.content) == 1
+            # Next row would not have fit
+            assert len(str(md.Table(page.content + following.content[:1],
+                                    ['a'], compact = compact))) > size
+    # ------------------------------------------------------------------
+    def test_pages_invalid(self):
+        with pytest.raises(ValueError):
+            next(md.Table([], []).pages())
+        with pytest.raises(ValueError):
+            next(md.Table([], []).pages(0))
+    # ------------------------------------------------------------------
+    def test_to_files(self, tmp_path):
+        rows = [[n] for n in range(5)]
+        paths = md.Table(rows, ['n']).to_files(tmp_path / 'table.md.gz', 2)
+        assert [path.name for path in paths] == ['table_1.md.gz',
+                                                 'table_2.md.gz',
+                                                 'table_3.md.gz']
+        texts = [gzip.decompress(path.read_bytes()).decode() for path in paths]
+        assert texts[1] == str(md.Document([
+            md.Paragraph(['Page 2',
+                          md.Link('table_1.md.gz', 'Previous'),
+                          md.Link('table_3.md.gz', 'Next')], ' | '),
+            md.Table(rows[2:4], ['n']),
+            md.Paragraph(['Page 2',
+                          md.Link('table_1.md.gz', 'Previous'),
+                          md.Link('table_3.md.gz', 'Next')], ' | ')])) + '\n'
+        assert 'Previous' not in texts[0] and 'Next' not in texts[2]
+    # ------------------------------------------------------------------
+    def test_EncodedColumn(self):
+        column = md.EncodedColumn.encode(['a', 'b', 'a', 1, '1'])
+        assert column.values == ['a', 'b', '1']
+        assert column.codes.typecode == 'B'
+        assert list(column) == ['a', 'b', 'a', '1', '1']
+        assert list(column[1:3]) == ['b', 'a']
+        assert column[3] == '1'
+        assert column.index('b') == 1 and column.count('a') == 2
+        assert md.EncodedColumn(range(300), range(300)).codes.typecode == 'H'
+    # ------------------------------------------------------------------
+    @pytest.mark.parametrize('compact', (False, True))
+    @pytest.mark.parametrize('workers', (1, 2))
+    def test_encoded_as_rows(self, monkeypatch, compact, workers):
+        monkeypatch.setattr(_API, '_ROW_CHUNK', 3)
+        rows = [['ok', 'eu'], ['failed|retry', 'us'], ['ok'],
+                ['ok', 'eu'], ['ok', 'eu'], ['x\ny', 'eu'], ['ok', 'eu']]
+        aligns = [md.CENTER, md.RIGHT]
+        expected = str(md.Table(rows, ['status', 'region', 'host'],
+                                aligns, compact))
+        table = md.Table(rows, ['status', 'region', 'host'], aligns, compact,
+                         workers = workers)
+        assert str(table.encode()) == expected
+        assert isinstance(table.content, md.Columns)
+        assert all(isinstance(column, md.EncodedColumn)
+                   for column in table.content.columns)
+        table = md.Table(rows, ['status', 'region', 'host'], aligns, compact)
+        assert str(table.encode([1])) == expected
+        assert not isinstance(table.content.columns[0], md.EncodedColumn)
+    # ------------------------------------------------------------------
+    @pytest.mark.parametrize('compact', (False, True))
+    def test_workers(self, monkeypatch, compact):
+        monkeypatch.setattr(_API, '_ROW_CHUNK', 7)
+        rows = [[n, 'a|b' * (n % 3)][:1 + n % 2] for n in range(50)]
+        aligns = [md.CENTER, md.RIGHT]
+        expected = str(md.Table(rows, ['a'], aligns, compact))
+        assert str(md.Table(rows, ['a'], aligns, compact,
+                            workers = 2)) == expected
+        columns = md.Columns([list(range(50)), ['x|y'] * 30])
+        assert (str(md.Table(columns, ['a'], aligns, compact, workers = 2))
+                == str(md.Table(columns, ['a'], aligns, compact)))
+    # ------------------------------------------------------------------
+    def test_append_rows(self):
+        table = md.Table([[1, 'a|b']], ['a', 'b'])
+        assert table.append_rows([22, 'c']) is table
+        assert str(table) == str(md.Table([[1, 'a|b'], [22, 'c']],
+                                          ['a', 'b']))
+        table.extend([[333, 'dddddddddd', 'e']])
+        rows = [[1, 'a|b'], [22, 'c'], [333, 'dddddddddd', 'e']]
+        assert str(table) == str(md.Table(rows, ['a', 'b']))
+        # Header and alignment changes repad the rows
+        table.header = ['aaaaaa']
+        table.align = md.RIGHT
+        assert str(table) == str(md.Table(rows, ['aaaaaa'], md.RIGHT))
+        table.compact = True
+        assert str(table) == str(md.Table(rows, ['aaaaaa'], md.RIGHT, True))
+        # In place modification is seen after invalidate
+        table.content[0][0] = 'x' * 10
+        rows[0][0] = 'x' * 10
+        assert str(table.invalidate()) == str(md.Table(rows, ['aaaaaa'],
+                                                       md.RIGHT, True))
+    # ------------------------------------------------------------------
+    def test_append_rows_converts_only_new(self):
+        class Cell:
+            n_converted = 0
+            def __str__(self):
+                Cell.n_converted += 1
+                return 'cell'
+        table = md.Table([], ['a']).extend([[Cell()] for _ in range(10)])
+        str(table)
+        assert Cell.n_converted == 10
+        table.append_rows([Cell()], [Cell()])
+        str(table)
+        assert Cell.n_converted == 12
+    # ------------------------------------------------------------------
+    def test_iterator_not_cached(self):
+        table = md.Table((row for row in [[1, 2]]), ['a', 'b'])
+        assert str(md.Document([table])) == str(md.Table([[1, 2]], ['a', 'b']))
+        assert table._rendered is None
+    # ------------------------------------------------------------------
+    @pytest.mark.parametrize('compact', (False, True))
+    def test_iterator_spilled(self, monkeypatch, compact):
+        monkeypatch.setattr(_API, '_ROW_CHUNK', 7)
+        monkeypatch.setattr(_API, '_SPILL_ROWS', 20)
+        spilled = []
+        spill = _API._spill
+        monkeypatch.setattr(_API, '_spill',
+                            lambda: spilled.append(True) or spill())
+        rows = [[n, 'a|b\r\nc' * (n % 3), 'x' * (n % 11)][:1 + n % 4]
+                for n in range(100)]
+        rows[50] = []
+        expected = str(md.Table(rows, ['a', 'b'], compact = compact))
+        assert not spilled
+        assert str(md.Table(iter(rows), ['a', 'b'],
+                            compact = compact)) == expected
+        assert spilled
+    # ------------------------------------------------------------------
+    @pytest.mark.parametrize('compact', (False, True))
+    def test_schema_as_computed_widths(self, compact):
+        rows = [[1, 'a|b', 3333], (4, 5, 6, 7), ['x\ny']]
+        header = ['a', 'b', 'c']
+        aligns = [md.LEFT, md.CENTER, md.RIGHT]
+        table = md.Table(iter(rows), header, aligns, compact,
+                         schema = md.TableSchema([10, 8, 4, 3]))
+        assert str(table) == str(md.Table(rows, header, aligns, compact))
+    # ------------------------------------------------------------------
+    @pytest.mark.parametrize('overflow, expected', [
+        (md.TRUNCATE, '| 1   | abcd… |\n'
+                      '| 2   | ab    |'),
+        (md.WRAP, '| 1   | abcde |\n'
+                  '|     | fgh   |\n'
+                  '|     | i     |\n'
+                  '| 2   | ab    |'),
+        (md.EXPAND, '| 1   | abcdefgh<br><br>i |\n'
+                    '| 2   | ab    |')])
+    def test_schema_overflow(self, overflow, expected):
+        table = md.Table(iter([[1, 'abcdefgh\ni'], [2, 'ab']]), ['a', 'b'],
+                         schema = md.TableSchema([3, 5], overflow))
+        assert str(table) == ('| a   | b     |\n'
+                              '| :-- | :---- |\n' + expected)
+    # ------------------------------------------------------------------
+    def test_schema_streams_rows(self):
+        writer = io.StringIO()
+        def rows():
+            for n in itertools.count():
+                yield [n]
+                if writer.getvalue().count('\n') > 3:
+                    raise RuntimeError('Rows were written as they arrived')
+        table = md.Table(rows(), ['n'], schema = md.TableSchema([5]))
+        with pytest.raises(RuntimeError):
+            table.render_into(writer)
+    # ------------------------------------------------------------------
+    def test_schema_too_many_cells(self):
+        with pytest.raises(ValueError):
+            str(md.Table([[1, 2, 3]], ['a'], schema = md.TableSchema([3, 3])))
+    # ------------------------------------------------------------------
     def test_from_csv_with_header(self):
         assert str(md.Table.from_csv(self.path_tables / 'with_header.csv')
                    ) == self.simple_table
@@ -470,6 +1070,234 @@ class Test_Table:
             print(type(file))
             table = md.Table.from_csv(file)
         assert str(table) == self.simple_table
+    # ------------------------------------------------------------------
+    @pytest.mark.parametrize('name, args, kwargs', [
+        ('with_header.csv', (), {}),
+        ('without_header.csv', (['a', 'b'],), {}),
+        ('with_header.csv', (False,), {}),
+        ('semicolon_separated.csv', (), {'delimiter': ';'})])
+    def test_from_csv_stream(self, name, args, kwargs):
+        path = self.path_tables / name
+        table = md.Table.from_csv(path, *args, stream = True, **kwargs)
+        assert isinstance(table.content, md.CSVRows)
+        assert str(table) == str(md.Table.from_csv(path, *args, **kwargs))
+    # ------------------------------------------------------------------
+    @pytest.mark.parametrize('workers', (1, 2))
+    @pytest.mark.parametrize('compact', (False, True))
+    def test_from_csv_stream_chunks(self, tmp_path, workers, compact):
+        path = tmp_path / 'table.csv'
+        rows = [[str(i), 'a|b' * (i % 3), 'line\n"quoted"' * (i % 5 == 0)]
+                [:1 + i % 3] for i in range(200)]
+        with open(path, 'w', encoding = 'utf8', newline = '') as file:
+            csv.writer(file).writerows(rows)
+        content = md.CSVRows(path, True, workers = workers, chunk_size = 64)
+        assert len(content.offsets) > 3
+        assert len(content) == 199
+        assert list(map(list, content)) == rows[1:]
+        assert (str(md.Table(content, content.header, compact = compact))
+                == str(md.Table(rows[1:], rows[0], compact = compact)))
+        # Changed file is scanned again
+        with open(path, 'a', encoding = 'utf8', newline = '') as file:
+            csv.writer(file).writerow(['x' * 100])
+        assert (str(md.Table(content, content.header, compact = compact))
+                == str(md.Table(rows[1:] + [['x' * 100]], rows[0],
+                                compact = compact)))
+    # ------------------------------------------------------------------
+    def test_from_csv_stream_file(self):
+        with open(self.path_tables / 'with_header.csv', 'r',
+                  encoding = 'utf8', newline = '') as file:
+            with pytest.raises(ValueError):
+                md.Table.from_csv(file, stream = True)
+    # ------------------------------------------------------------------
+    @pytest.mark.parametrize('spec, cells', [
+        ('.2f', ['1.50', '-1234.00', 'x', '']),
+        (',', ['1.5', '-1,234', 'x', '']),
+        ('.1%', ['150.0%', '-123400.0%', 'x', '']),
+        ('.1S', ['1.5', '-1.2k', 'x', '']),
+        ('S', ['1.5', '-1.234k', 'x', ''])])
+    def test_formats(self, spec, cells):
+        rows = [[1.5], [-1234], ['x'], []]
+        expected = md.Table([[cell] for cell in cells], ['a'], md.RIGHT)
+        assert str(md.Table(rows, ['a'], formats = spec)) == str(expected)
+        assert str(md.Table(iter(rows), ['a'], formats = [spec])
+                   ) == str(expected)
+        assert str(md.Table(md.Columns([[1.5, -1234, 'x', '']]), ['a'],
+                            formats = spec)) == str(expected)
+        # Text numbers e.g. from CSV are parsed
+        assert str(md.Table([[str(cell) for cell in row] for row in rows],
+                            ['a'], formats = spec)) == str(expected)
+    # ------------------------------------------------------------------
+    def test_formats_align(self):
+        table = md.Table([[1, 2, 'a']], ['a', 'b', 'c'], formats = [None, 'd'])
+        assert str(table) == ('| a   |   b | c   |\n'
+                              '| :-- | --: | :-- |\n'
+                              '| 1   |   2 | a   |')
+        table.align = md.CENTER
+        assert str(table) == ('|  a  |  b  |  c  |\n'
+                              '| :-: | :-: | :-: |\n'
+                              '|  1  |  2  |  a  |')
+    # ------------------------------------------------------------------
+    @pytest.mark.parametrize('spec', ('.1S', '.3gS', ',.2f', '.0%', 'e'))
+    def test_formats_numpy(self, spec):
+        np = pytest.importorskip('numpy')
+        values = np.array([0, 1e-7, -0.0123, 999.96, 123456.789, 999999.,
+                           5e30, np.nan, np.inf])
+        rows = [[value] for value in values.tolist()]
+        assert (str(md.Table(md.Columns([values]), ['a'], formats = spec))
+                == str(md.Table(rows, ['a'], formats = spec)))
+        integers = np.arange(-2000, 2000, 7)
+        assert (str(md.Table(md.Columns([integers]), ['a'], formats = spec))
+                == str(md.Table([[value] for value in integers.tolist()],
+                                ['a'], formats = spec)))
+    # ------------------------------------------------------------------
+    def test_formats_appended(self):
+        table = md.Table([[1234.5]], ['a'], formats = '.1S')
+        table.append_rows([12.5])
+        assert str(table) == ('|    a |\n'
+                              '| ---: |\n'
+                              '| 1.2k |\n'
+                              '| 12.5 |')
+        table.formats = ',.0f'
+        assert str(table) == ('|     a |\n'
+                              '| ----: |\n'
+                              '| 1,234 |\n'
+                              '|    12 |')
+    # ------------------------------------------------------------------
+    @pytest.mark.parametrize('stream', (False, True))
+    def test_from_csv_formats(self, tmp_path, stream):
+        path = tmp_path / 'table.csv'
+        path.write_text('a,b\n1200,x\n12.5,3\n', encoding = 'utf8')
+        table = md.Table.from_csv(path, stream = stream,
+                                  formats = ['.1S', '.2f'])
+        assert str(table) == ('|    a |    b |\n'
+                              '| ---: | ---: |\n'
+                              '| 1.2k |    x |\n'
+                              '| 12.5 | 3.00 |')
+    # ------------------------------------------------------------------
+    @pytest.fixture
+    def csv_shards(self, tmp_path):
+        texts = {'a.csv': 'x,y\n1,2\n3,4\n',
+                 'b.csv': 'y,z,z\n5,6,7\n',
+                 'c.csv': 'x\n'}
+        for name, text in texts.items():
+            (tmp_path / name).write_text(text, encoding = 'utf8')
+        return [tmp_path / name for name in texts]
+    # ------------------------------------------------------------------
+    @pytest.mark.parametrize('workers', (1, 2))
+    def test_from_csv_many_union(self, csv_shards, workers):
+        table = md.Table.from_csv_many(str(csv_shards[0].parent / '*.csv'),
+                                       source = 'file', workers = workers)
+        assert isinstance(table.content.columns[-1], md.EncodedColumn)
+        a, b, _ = map(str, csv_shards)
+        assert str(table) == str(md.Table([['1', '2', '', '', a],
+                                           ['3', '4', '', '', a],
+                                           ['', '5', '6', '7', b]],
+                                          ['x', 'y', 'z', 'z', 'file']))
+        table = md.Table.from_csv_many(csv_shards[:2], ['p'],
+                                       workers = workers)
+        assert str(table) == str(md.Table([['x', 'y', ''], ['1', '2', ''],
+                                           ['3', '4', ''], ['y', 'z', 'z'],
+                                           ['5', '6', '7']], ['p']))
+    # ------------------------------------------------------------------
+    @pytest.mark.parametrize('workers', (1, 2))
+    def test_from_csv_many_separate(self, csv_shards, workers):
+        tables = md.Table.from_csv_many(csv_shards, union = False,
+                                        workers = workers)
+        assert [str(table) for table in tables] == [
+            str(md.Table.from_csv(path)) for path in csv_shards]
+    # ------------------------------------------------------------------
+    rows = [(1, 'a|b', 1.5), (2, 'c', None), (3, 'a|b', -2.0)]
+    header = ['n', 's', 'x']
+    def test_from_records(self):
+        expected = str(md.Table(self.rows, self.header))
+        records = [dict(zip(self.header, row)) for row in self.rows]
+        assert str(md.Table.from_records(iter(records))) == expected
+        assert str(md.Table.from_records(self.rows, header = self.header)
+                   ) == expected
+        assert str(md.Table.from_records(records, ['x', 'n'])
+                   ) == str(md.Table([(x, n) for n, _, x in self.rows],
+                                     ['x', 'n']))
+        assert str(md.Table.from_records([{'a': 1}, {'b': 2}, (3, 4)][:2],
+                                         ['a', 'b'])) == str(
+            md.Table([[1, ''], ['', 2]], ['a', 'b']))
+        assert str(md.Table.from_records([(1, 2), (3,)])) == str(
+            md.Table([[1, 2], [3]], []))
+        assert str(md.Table.from_records([])) == str(md.Table([], []))
+    # ------------------------------------------------------------------
+    @pytest.fixture
+    def jsonl(self, tmp_path):
+        path = tmp_path / 'events.jsonl'
+        records = [{'n': n, 's': 'a|b' if n % 3 else 'c', 'x': n / 4,
+                    **({'extra': [n]} if n % 5 == 0 else {})}
+                   for n in range(100)]
+        path.write_text('\n'.join(map(json.dumps, records)) + '\n\n',
+                        encoding = 'utf8')
+        return path, records
+    # ------------------------------------------------------------------
+    @pytest.mark.parametrize('stream', (False, True))
+    @pytest.mark.parametrize('workers', (1, 2))
+    def test_from_jsonl(self, monkeypatch, jsonl, stream, workers):
+        monkeypatch.setattr(md._API, '_JSONL_CHUNK', 256)
+        path, records = jsonl
+        keys = ['n', 's', 'x', 'extra']
+        table = md.Table.from_jsonl(path, stream = stream, workers = workers)
+        assert str(table) == str(md.Table.from_records(records, keys))
+        for limit in (0, 1, 37, 1000):
+            table = md.Table.from_jsonl(path, ['x', 'extra', 'none'], limit,
+                                        stream = stream, workers = workers)
+            assert str(table) == str(md.Table.from_records(
+                records[:limit], ['x', 'extra', 'none'],
+                ['x', 'extra', 'none']))
+    # ------------------------------------------------------------------
+    @pytest.mark.parametrize('stream', (False, True))
+    def test_Listing_from_jsonl(self, jsonl, stream):
+        path, records = jsonl
+        listing = md.Listing.from_jsonl(path, 's', limit = 3, stream = stream)
+        assert str(listing) == '- c\n- a|b\n- a|b'
+        listing = md.Listing.from_jsonl(path, ['n', 'x'], md.ORDERED, 2,
+                                        separator = ': ', stream = stream)
+        assert str(listing) == '1. 0: 0.0\n2. 1: 0.25'
+        assert (len(md.Listing.from_jsonl(path).content) == len(records))
+    # ------------------------------------------------------------------
+    @pytest.mark.parametrize('stream', (False, True))
+    @pytest.mark.parametrize('batch_size', (1, 2, 100))
+    def test_from_cursor(self, stream, batch_size):
+        connection = sqlite3.connect(':memory:')
+        connection.execute('CREATE TABLE t (n INTEGER, s TEXT, x REAL)')
+        connection.executemany('INSERT INTO t VALUES (?, ?, ?)', self.rows)
+        table = md.Table.from_cursor(connection.execute('SELECT * FROM t'),
+                                     batch_size = batch_size,
+                                     stream = stream)
+        assert isinstance(table.content, md.Columns) is not stream
+        assert str(table) == str(md.Table(self.rows, self.header))
+        table = md.Table.from_cursor(
+            connection.execute('SELECT * FROM t WHERE n > 3'), False)
+        assert str(table) == ('|     |     |     |\n'
+                              '| :-- | :-- | :-- |')
+    # ------------------------------------------------------------------
+    def test_from_dataframe(self):
+        pd = pytest.importorskip('pandas')
+        frame = pd.DataFrame(self.rows, columns = self.header,
+                             index = pd.Index([5, 6, 7], name = 'i'))
+        frame['c'] = pd.Categorical(['q', None, 'q'])
+        table = md.Table.from_dataframe(frame, True)
+        assert isinstance(table.content.columns[-1], md.EncodedColumn)
+        assert str(table) == str(md.Table(
+            [(5, 1, 'a|b', 1.5, 'q'), (6, 2, 'c', 'nan', ''),
+             (7, 3, 'a|b', -2.0, 'q')], ['i', *self.header, 'c']))
+    # ------------------------------------------------------------------
+    def test_from_arrow(self):
+        pa = pytest.importorskip('pyarrow')
+        table = pa.table({'n': pa.chunked_array([[1], [2, 3]]),
+                          's': pa.chunked_array([
+                              pa.array(['a|b']).dictionary_encode(),
+                              pa.array(['c', 'a|b']).dictionary_encode()]),
+                          'x': [1.5, None, -2.0]})
+        expected = str(md.Table([(1, 'a|b', 1.5), (2, 'c', 'nan'),
+                                 (3, 'a|b', -2.0)], self.header))
+        assert str(md.Table.from_arrow(table)) == expected
+        assert str(md.Table.from_arrow(table.combine_chunks()
+                                       .to_batches()[0])) == expected
 # ======================================================================
 # ======================================================================
 class Test_Text: